@@ -0,0 +1,206 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Benchmark suite timing the public methods of both graph classes on seeded synthetic graphs.
+#
+# Usage: python benchmark.py [--sizes 250 500 1000] [--generators er grid power_law chain]
+#                            [--backend dense|sparse] [--repeat 3] [--output benchmark_results.json]
+
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+
+from d_graph import DirectedGraph, SparseDirectedGraph
+from ud_graph import UndirectedGraph
+
+
+# ------------------------------------------------------------------ #
+# seeded graph generators, each returns a list of (u, v) integer edges
+
+def erdos_renyi(n: int, seed=0, average_degree=4) -> []:
+    """
+    Return a G(n, m) random graph with n * average_degree / 2 edges picked uniformly
+    """
+    rnd = random.Random(seed)
+    return [(rnd.randrange(n), rnd.randrange(n)) for _ in range(n * average_degree // 2)]
+
+
+def grid_2d(n: int, seed=0) -> []:
+    """
+    Return a square 2-D grid with about n vertices, each joined to its right and lower neighbour
+    """
+    side = max(1, int(n ** 0.5))
+    edges = []
+    for row in range(side):
+        for column in range(side):
+            vertex = row * side + column
+            if column + 1 < side:
+                edges.append((vertex, vertex + 1))
+            if row + 1 < side:
+                edges.append((vertex, vertex + side))
+    return edges
+
+
+def power_law(n: int, seed=0, edges_per_vertex=2) -> []:
+    """
+    Return a Barabasi-Albert preferential attachment graph, which has a power-law degree distribution
+    """
+    rnd = random.Random(seed)
+    ends = list(range(edges_per_vertex))    # every vertex appears once per edge end, so picks follow the degree
+    edges = []
+    for vertex in range(edges_per_vertex, n):
+        for _ in range(edges_per_vertex):
+            target = rnd.choice(ends)
+            edges.append((vertex, target))
+            ends.append(target)
+        ends.extend([vertex] * edges_per_vertex)
+    return edges
+
+
+def chain(n: int, seed=0, shortcuts=1) -> []:
+    """
+    Return a deep DAG: a path 0 -> 1 -> ... -> n - 1 plus forward shortcut edges, which stresses recursion depth
+    """
+    rnd = random.Random(seed)
+    edges = [(vertex, vertex + 1) for vertex in range(n - 1)]
+    for _ in range(n * shortcuts):
+        u = rnd.randrange(n)
+        v = rnd.randrange(n)
+        if u != v:
+            edges.append((min(u, v), max(u, v)))
+    return edges
+
+
+GENERATORS = {'er': erdos_renyi, 'grid': grid_2d, 'power_law': power_law, 'chain': chain}
+
+
+# ------------------------------------------------------------------ #
+# benchmarked operations, each takes a fresh graph and its edges
+
+def undirected_operations(edges: [], seed: int) -> dict:
+    """
+    Return the benchmarked UndirectedGraph operations as name -> (setup, operation) pairs
+    """
+    names = [(str(u), str(v)) for u, v in edges]
+    vertices = sorted({v for edge in names for v in edge})
+    rnd = random.Random(seed)
+    start = vertices[0] if vertices else None
+    removed = rnd.sample(vertices, max(1, len(vertices) // 100)) if vertices else []
+
+    def build():
+        return UndirectedGraph(names)
+
+    def add_edges(_):
+        graph = UndirectedGraph()
+        for u, v in names:
+            graph.add_edge(u, v)
+
+    def remove_vertices(graph):
+        for v in removed:
+            graph.remove_vertex(v)
+
+    return {
+        'add_edge': (lambda: None, add_edges),
+        'remove_vertex': (build, remove_vertices),
+        'get_edges': (build, lambda graph: graph.get_edges()),
+        'dfs': (build, lambda graph: graph.dfs(start)),
+        'bfs': (build, lambda graph: graph.bfs(start)),
+        'count_connected_components': (build, lambda graph: graph.count_connected_components()),
+        'has_cycle': (build, lambda graph: graph.has_cycle()),
+    }
+
+
+def directed_operations(edges: [], seed: int, graph_class) -> dict:
+    """
+    Return the benchmarked DirectedGraph operations as name -> (setup, operation) pairs
+    """
+    rnd = random.Random(seed)
+    weighted = [(u, v, rnd.randint(1, 20)) for u, v in edges]
+    v_count = max((max(u, v) for u, v in edges), default=0) + 1
+
+    def build():
+        return graph_class(weighted)
+
+    def add_edges(_):
+        graph = graph_class()
+        graph.add_vertices(v_count)
+        for u, v, weight in weighted:
+            graph.add_edge(u, v, weight)
+
+    return {
+        'add_edge': (lambda: None, add_edges),
+        'get_edges': (build, lambda graph: graph.get_edges()),
+        'dfs': (build, lambda graph: graph.dfs(0)),
+        'bfs': (build, lambda graph: graph.bfs(0)),
+        'has_cycle': (build, lambda graph: graph.has_cycle()),
+        'dijkstra': (build, lambda graph: graph.dijkstra(0)),
+    }
+
+
+# ------------------------------------------------------------------ #
+
+def measure(setup, operation, repeat: int) -> dict:
+    """
+    Return the best wall time over repeat runs of operation and the peak memory it allocates
+    Setup runs outside the measurement, memory is traced in a separate run so it does not slow the timed ones
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        graph = setup()
+        start = time.perf_counter()
+        operation(graph)
+        best = min(best, time.perf_counter() - start)
+
+    graph = setup()
+    tracemalloc.start()
+    operation(graph)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': best, 'peak_bytes': peak}
+
+
+def run(sizes: [], generators: [], backend='sparse', repeat=3, seed=0, log=print) -> dict:
+    """
+    Run every operation of both graph classes on every generator and size, and return the results
+    """
+    graph_class = SparseDirectedGraph if backend == 'sparse' else DirectedGraph
+    results = []
+    for name in generators:
+        for size in sizes:
+            edges = GENERATORS[name](size, seed)
+            suites = (('UndirectedGraph', undirected_operations(edges, seed)),
+                      (graph_class.__name__, directed_operations(edges, seed, graph_class)))
+            for class_name, operations in suites:
+                for method, (setup, operation) in operations.items():
+                    result = measure(setup, operation, repeat)
+                    result.update({'class': class_name, 'method': method, 'generator': name,
+                                   'size': size, 'edges': len(edges)})
+                    results.append(result)
+                    log(f"{class_name:>20} {method:<27} {name:<10} n={size:<8} "
+                        f"{result['seconds'] * 1000:10.2f} ms {result['peak_bytes'] / 1024:10.1f} KiB")
+
+    return {'python': platform.python_version(), 'backend': backend, 'seed': seed, 'repeat': repeat,
+            'results': results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the graph classes on synthetic graphs.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[250, 500, 1000])
+    parser.add_argument('--generators', nargs='+', choices=sorted(GENERATORS), default=list(GENERATORS))
+    parser.add_argument('--backend', choices=['dense', 'sparse'], default='sparse')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.generators, args.backend, args.repeat, args.seed)
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f'wrote {len(report["results"])} results to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,397 @@
 # Description: Implementation of a direction graph class and its methods.
 
 import heapq
-from collections import deque
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 
-class DirectedGraph:
+import frontier_bfs
+import graph_format
+from graph_arrays import as_list
+from graph_stats import InstrumentedGraph
+
+try:
+    import numpy as np
+except ImportError:     # NumPy is optional, only the vectorised code paths need it
+    np = None
+
+# edge density (edges / V^2) from which all_pairs_shortest_paths prefers Floyd-Warshall over repeated Dijkstra
+DENSE_GRAPH_DENSITY = 0.1
+
+# work (V * (V + E), about half a microsecond each) below which repeated Dijkstra runs in the calling process, since
+# starting a pool and sending it a frozen copy of the graph costs more than it saves; larger graphs get one process per
+# this much work, up to the requested pool size
+PARALLEL_MIN_WORK = 1 << 18
+
+
+class TopologicalOrder:
+    """
+    Topological order of a DAG that is kept up to date as edges are added
+    - edges that agree with the order cost O(1)
+    - other edges only reorder the part of the order between their two ends
+    """
+
+    def __init__(self, order: [], reject_cycles=True):
+        """
+        Store the order as a list of vertices and the position of every vertex in that list
+        """
+        self.order = order
+        self.position = [0] * len(order)
+        for i, vertex in enumerate(order):
+            self.position[vertex] = i
+        self.reject_cycles = reject_cycles
+
+    def append(self, vertex: int) -> None:
+        """
+        This method places a new vertex with no edges at the end of the order.
+        """
+        self.position.append(len(self.order))
+        self.order.append(vertex)
+
+    def insert_edge(self, graph, src: int, dst: int) -> bool:
+        """
+        This method updates the order for a new edge src -> dst of the parameter graph. It returns False, leaving the
+        order untouched, if the edge would create a cycle.
+        """
+        position = self.position
+        lo, hi = position[dst], position[src]
+
+        # src already comes before dst so the order stays valid
+        if hi < lo:
+            return True
+
+        # find the vertices reachable from dst that sit before src in the order, successors of a vertex always sit
+        # after it so nothing past src needs to be searched
+        reached = {dst}
+        stack = [dst]
+        while stack:
+            vertex = stack.pop()
+            for i, _ in graph._successors(vertex):
+                # dst reaches src so the new edge closes a cycle
+                if i == src:
+                    return False
+                if position[i] < hi and i not in reached:
+                    reached.add(i)
+                    stack.append(i)
+
+        # move the reached vertices after everything else between dst and src, keeping their relative order
+        window = self.order[lo:hi + 1]
+        window = [v for v in window if v not in reached] + [v for v in window if v in reached]
+        self.order[lo:hi + 1] = window
+        for i, vertex in enumerate(window, lo):
+            position[vertex] = i
+        return True
+
+
+class ShortestPathCache:
+    """
+    LRU cache of single source shortest path results keyed by source vertex
+    - every entry belongs to one graph version, a mutation of the graph empties the cache
+    - bounded by a number of entries and optionally by an approximate size in bytes
+    """
+
+    def __init__(self, max_entries=128, max_bytes=None):
+        """
+        Store the entries in least recently used order
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()    # Key is the source. Value is a tuple (distances, predecessors, size in bytes).
+        self.version = None             # graph version the entries were computed for
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, src: int, version: int):
+        """
+        This method returns the cached (distances, predecessors) of src for the parameter graph version, or None.
+        """
+        # the graph changed since the entries were computed so none of them can be used
+        if version != self.version:
+            if self.entries:
+                self.invalidations += 1
+            self.clear()
+            self.version = version
+
+        entry = self.entries.get(src)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(src)   # src is now the most recently used entry
+        return entry[0], entry[1]
+
+    def put(self, src: int, version: int, distances: dict, predecessors: dict) -> None:
+        """
+        This method stores the result for src, evicting least recently used entries to stay within the bounds.
+        """
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+        size = sys.getsizeof(distances) + sys.getsizeof(predecessors)
+        if src in self.entries:
+            self.bytes -= self.entries.pop(src)[2]
+        self.entries[src] = (distances, predecessors, size)
+        self.bytes += size
+
+        # evict from the least recently used end, but always keep the entry just added
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or
+                                         (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            _, (_, _, evicted_size) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        This method removes every entry.
+        """
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        """
+        This method returns the cache counters as a dictionary.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'invalidations': self.invalidations, 'entries': len(self.entries), 'bytes': self.bytes}
+
+
+class DynamicShortestPaths:
+    """
+    Shortest path distances from a set of registered sources, kept up to date as edges of a graph change
+    - edge changes made through add_edge and remove_edge only repair the part of each shortest path tree they affect
+    - a shorter or new edge spreads the improvement forward from its destination, like Dijkstra's algorithm
+    - a longer or removed edge first finds the vertices that lost every shortest path (the vertices reached through
+      it that have no other equally short path left, as in the algorithm of Ramalingam and Reps), then recomputes
+      only those from their unaffected neighbours
+    - changes made directly on the graph are detected through its version counter and trigger a full recomputation
+    """
+
+    def __init__(self, graph, sources=()):
+        """
+        Store the graph and compute the distances from every source
+        """
+        self.graph = graph
+        self.trees = dict()     # Key is a source. Value is a tuple (distances, predecessors) of the reached vertices.
+        self.incoming = []      # incoming[v] maps every vertex u with an edge u -> v to the weight of that edge
+        self.version = None     # graph version the distances were computed for
+        self._sync()
+        for src in sources:
+            self.add_source(src)
+
+    def add_source(self, src: int) -> None:
+        """
+        This method starts tracking the distances from src, does nothing if they are already tracked.
+        """
+        self._sync()
+        if src not in self.trees and 0 <= src < self.graph.v_count:
+            self.trees[src] = self.graph._dijkstra_search([src])
+
+    def remove_source(self, src: int) -> None:
+        """
+        This method stops tracking the distances from src.
+        """
+        self.trees.pop(src, None)
+
+    def sources(self) -> []:
+        """
+        This method returns the tracked sources.
+        """
+        return list(self.trees)
+
+    def distances(self, src: int) -> []:
+        """
+        This method returns the distance from src to every vertex, like DirectedGraph.dijkstra(src).
+        """
+        self._sync()
+        distances = self.trees[src][0]
+        return [distances.get(i, float('inf')) for i in range(self.graph.v_count)]
+
+    def shortest_path(self, src: int, dst: int):
+        """
+        This method returns a tuple (distance, path) for the shortest path from src to dst, like
+        DirectedGraph.shortest_path, or (infinity, []) if dst is not reachable.
+        """
+        self._sync()
+        distances, predecessors = self.trees[src]
+        if dst not in distances:
+            return float('inf'), []
+        return distances[dst], _path_to(predecessors, dst)
+
+    def add_edge(self, src: int, dst: int, weight=1) -> dict:
+        """
+        This method adds or reweights the edge src -> dst of the graph with the rules of DirectedGraph.add_edge and
+        repairs the distances. It returns, for every source whose distances changed, a dictionary mapping each
+        changed vertex to its new distance (infinity if it can no longer be reached).
+        """
+        self._sync()
+        old_weight = self._edge_weight(src, dst)
+        self.graph.add_edge(src, dst, weight)
+        return self._edge_changed(src, dst, old_weight)
+
+    def remove_edge(self, src: int, dst: int) -> dict:
+        """
+        This method removes the edge src -> dst from the graph and repairs the distances. It returns the changed
+        distances like add_edge.
+        """
+        self._sync()
+        old_weight = self._edge_weight(src, dst)
+        self.graph.remove_edge(src, dst)
+        return self._edge_changed(src, dst, old_weight)
+
+    def _edge_weight(self, src: int, dst: int):
+        """
+        This method returns the weight of the edge src -> dst, 0 if there is no such edge or no such vertices.
+        """
+        if 0 <= src < self.graph.v_count and 0 <= dst < self.graph.v_count:
+            return self.graph._weight(src, dst)
+        return 0
+
+    def _sync(self) -> None:
+        """
+        This method recomputes everything if the graph was changed other than through this object.
+        """
+        if self.version == self.graph._version:
+            return
+        graph = self.graph
+        self.incoming = [dict() for _ in range(graph.v_count)]
+        for u in range(graph.v_count):
+            for v, weight in graph._successors(u):
+                self.incoming[v][u] = weight
+        self.trees = {src: graph._dijkstra_search([src]) for src in self.trees if src < graph.v_count}
+        self.version = graph._version
+
+    def _edge_changed(self, src: int, dst: int, old_weight) -> dict:
+        """
+        This method updates the incoming edge index after the edge src -> dst changed from old_weight and repairs the
+        tree of every source. It returns the changed distances per source.
+        """
+        # the graph ignored the change
+        if self.version == self.graph._version:
+            return {}
+        self.version = self.graph._version
+        new_weight = self._edge_weight(src, dst)
+        if new_weight == old_weight:
+            return {}
+        if new_weight == 0:
+            del self.incoming[dst][src]
+        else:
+            self.incoming[dst][src] = new_weight
+
+        changes = dict()
+        for source, (distances, predecessors) in self.trees.items():
+            if src not in distances:
+                continue    # the edge cannot be on any path from this source
+            if new_weight != 0 and (old_weight == 0 or new_weight < old_weight):
+                changed = self._decrease(distances, predecessors, src, dst, new_weight)
+            elif distances[src] + old_weight == distances[dst]:
+                changed = self._increase(source, distances, predecessors, dst)
+            else:
+                changed = None  # the edge was on no shortest path and got longer, nothing changes
+            if changed:
+                changes[source] = changed
+        return changes
+
+    def _decrease(self, distances: dict, predecessors: dict, src: int, dst: int, weight) -> dict:
+        """
+        This method spreads the improvement brought by a shorter edge src -> dst and returns the changed distances.
+        """
+        new_distance = distances[src] + weight
+        if new_distance >= distances.get(dst, float('inf')):
+            return {}
+        distances[dst] = new_distance
+        predecessors[dst] = src
+
+        # Dijkstra's algorithm from dst, only vertices whose distance improves are pushed
+        changed = dict()
+        priority_queue = [(new_distance, dst)]
+        while priority_queue:
+            distance, vertex = heapq.heappop(priority_queue)
+            if distance > distances[vertex]:
+                continue
+            changed[vertex] = distance
+            for i, weight in self.graph._successors(vertex):
+                if distance + weight < distances.get(i, float('inf')):
+                    distances[i] = distance + weight
+                    predecessors[i] = vertex
+                    heapq.heappush(priority_queue, (distance + weight, i))
+        return changed
+
+    def _increase(self, source: int, distances: dict, predecessors: dict, dst: int) -> dict:
+        """
+        This method repairs the tree of source after an edge into dst that was on a shortest path got longer or was
+        removed, and returns the changed distances.
+        """
+        incoming, infinity = self.incoming, float('inf')
+
+        # find the affected vertices in order of distance: a vertex is affected when none of its incoming edges from an
+        # unaffected vertex still gives its distance, weights are positive so those vertices are always decided first
+        affected = dict()   # Key is an affected vertex. Value is its old distance.
+        queued = {dst}
+        priority_queue = [(distances[dst], dst)]
+        while priority_queue:
+            distance, vertex = heapq.heappop(priority_queue)
+            support = None
+            if vertex == source:
+                support = source
+            else:
+                for u, weight in incoming[vertex].items():
+                    if u not in affected and u in distances and distances[u] + weight == distance:
+                        support = u
+                        break
+            if support is not None:
+                if vertex != source:
+                    predecessors[vertex] = support
+                continue
+            affected[vertex] = distance
+            # successors reached through vertex on a shortest path may have lost it
+            for i, weight in self.graph._successors(vertex):
+                if i not in queued and distances.get(i) == distance + weight:
+                    queued.add(i)
+                    heapq.heappush(priority_queue, (distances[i], i))
+
+        # give every affected vertex its best distance through an unaffected vertex, then run Dijkstra's algorithm
+        # among the affected vertices only, the distances of all other vertices are still correct
+        priority_queue = []
+        for vertex in affected:
+            best, best_u = infinity, None
+            for u, weight in incoming[vertex].items():
+                if u not in affected and u in distances and distances[u] + weight < best:
+                    best, best_u = distances[u] + weight, u
+            distances[vertex], predecessors[vertex] = best, best_u
+            if best_u is not None:
+                priority_queue.append((best, vertex))
+        heapq.heapify(priority_queue)
+        while priority_queue:
+            distance, vertex = heapq.heappop(priority_queue)
+            if distance > distances[vertex]:
+                continue
+            for i, weight in self.graph._successors(vertex):
+                if i in affected and distance + weight < distances[i]:
+                    distances[i] = distance + weight
+                    predecessors[i] = vertex
+                    heapq.heappush(priority_queue, (distance + weight, i))
+
+        # vertices left without a path are no longer reached
+        changed = dict()
+        for vertex, old_distance in affected.items():
+            if distances[vertex] == infinity:
+                del distances[vertex]
+                del predecessors[vertex]
+                changed[vertex] = infinity
+            elif distances[vertex] != old_distance:
+                changed[vertex] = distances[vertex]
+        return changed
+
+
+class DirectedGraph(InstrumentedGraph):
     """
     Class to implement directed weighted graph
     - duplicate edges not allowed
@@ -51,6 +439,24 @@ class DirectedGraph:
         out = f"GRAPH ({self.v_count} vertices):\n{out}"
         return out
 
+    # online topological order, only kept once maintain_topological_order() is called
+    _topo = None
+
+    # version counter bumped by every mutation, and the opt-in shortest path cache that relies on it
+    _version = 0
+    _path_cache = None
+
+    # number of edges, kept up to date by every mutation
+    _edge_count = 0
+
+    # packed (keys, weights) edge index used by validate_paths, and the graph version it was built for
+    _edge_index = None
+    _edge_index_version = None
+
+    # read-only CSR snapshot returned by freeze(), and the graph version it was built for
+    _frozen = None
+    _frozen_version = None
+
     # ------------------------------------------------------------------ #
 
     def add_vertex(self) -> int:
@@ -69,9 +475,64 @@ class DirectedGraph:
         # add new row to the end of the adjacency list
         self.adj_matrix.append([0] * self.v_count)
 
+        # a vertex with no edges can go anywhere in the topological order
+        if self._topo is not None:
+            self._topo.append(self.v_count - 1)
+        self._version += 1
+
         # return the number of vertices in the graph after addition
         return self.v_count
 
+    def add_vertices(self, n: int) -> int:
+        """
+        This method adds n new vertices at once, growing every row of the adjacency matrix a single time instead of
+        once per vertex. It returns the number of vertices in the graph after addition.
+        """
+        if n <= 0:
+            return self.v_count
+
+        # add n columns to every existing row, then n new rows
+        padding = [0] * n
+        for row in self.adj_matrix:
+            row.extend(padding)
+        self.v_count += n
+        self.adj_matrix.extend([0] * self.v_count for _ in range(n))
+
+        if self._topo is not None:
+            for vertex in range(self.v_count - n, self.v_count):
+                self._topo.append(vertex)
+        self._version += 1
+        return self.v_count
+
+    @classmethod
+    def from_edge_arrays(cls, src, dst, weight=None):
+        """
+        This method builds a graph from parallel arrays of edge sources, destinations and weights (NumPy arrays or
+        any iterables, weights default to 1). The result is the same as passing the zipped edges as start_edges:
+        later duplicates overwrite earlier ones and invalid edges are skipped. All vertices are allocated in one pass
+        and the edges are written straight into the storage.
+        """
+        src, dst = as_list(src), as_list(dst)
+        weight = [1] * len(src) if weight is None else as_list(weight)
+        if not len(src) == len(dst) == len(weight):
+            raise ValueError('src, dst and weight must have the same length')
+
+        graph = cls()
+        graph.add_vertices(max(max(src, default=0), max(dst, default=0)) + 1)
+        graph._store_edges(src, dst, weight)
+        return graph
+
+    def _store_edges(self, src: [], dst: [], weight: []) -> None:
+        """
+        This method writes many edges with the same rules as add_edge, for a graph without an online topological order.
+        """
+        matrix, v_count = self.adj_matrix, self.v_count
+        for u, v, w in zip(src, dst, weight):
+            if u != v and w >= 0 and 0 <= u < v_count and 0 <= v < v_count:
+                matrix[u][v] = w
+        self._edge_count = sum(v_count - row.count(0) for row in matrix)
+        self._version += 1
+
     def add_edge(self, src: int, dst: int, weight=1) -> None:
         """
         This method adds a new edge to the graph by connecting the two parameter vertices. If an edge already
@@ -82,9 +543,19 @@ class DirectedGraph:
         if src == dst or weight < 0 or not (0 <= src < self.v_count and 0 <= dst < self.v_count):
             return
 
+        # writing the weight the edge already has changes nothing, the caches and snapshots stay valid
+        if self.adj_matrix[src][dst] == weight:
+            return
+
+        # keep the online topological order up to date, it may reject edges that would create a cycle
+        if self._topo is not None and weight != 0 and not self._topo_insert(src, dst):
+            return
+
         # if an edge already exists in the graph the method will update the weight of that edge otherwise
         # the method adds a new edge to the graph
+        self._edge_count += (weight != 0) - (self.adj_matrix[src][dst] != 0)
         self.adj_matrix[src][dst] = weight
+        self._version += 1
 
     def remove_edge(self, src: int, dst: int) -> None:
         """
@@ -92,10 +563,12 @@ class DirectedGraph:
         """
         # if the two provided index values are the same or if either or both vertex indices do not exist
         # or the edge doesnt exist the method does nothing
-        if src == dst or not (0 <= src < self.v_count and 0 <= dst < self.v_count):
+        if src == dst or not (0 <= src < self.v_count and 0 <= dst < self.v_count) or self.adj_matrix[src][dst] == 0:
             return
 
+        self._edge_count -= 1
         self.adj_matrix[src][dst] = 0
+        self._version += 1
 
     def get_vertices(self) -> []:
         """
@@ -110,7 +583,31 @@ class DirectedGraph:
             (source vertex, destination vertex, weight)
         The list is in no particular order
         """
-        return [(row, column, self.adj_matrix[row][column]) for row in range(self.v_count) for column in range(self.v_count) if self.adj_matrix[row][column] != 0]
+        return list(self.iter_edges())
+
+    def iter_edges(self):
+        """
+        This method lazily yields the edges of the graph as (source vertex, destination vertex, weight) tuples, in
+        O(V + E) time for the sparse backends.
+        """
+        for row in range(self.v_count):
+            for column, weight in self._successors(row):
+                yield row, column, weight
+
+    def edge_count(self) -> int:
+        """
+        This method returns the number of edges in the graph in O(1) time.
+        """
+        return self._edge_count
+
+    def degree(self, vertex: int) -> int:
+        """
+        This method returns the out-degree of the parameter vertex, or 0 if the vertex does not exist. It takes O(1)
+        time for the sparse backends and one C-speed scan of the matrix row for the adjacency matrix.
+        """
+        if not 0 <= vertex < self.v_count:
+            return 0
+        return self.v_count - self.adj_matrix[vertex].count(0)
 
     def is_valid_path(self, path: []) -> bool:
         """
@@ -127,113 +624,362 @@ class DirectedGraph:
             # if the cur index is not in the graph return False since the path is not valid
             if not 0 <= cur < self.v_count: return False
             # if there is not an edge from the current vertex to the next vertex in the graph return False
-            if self.adj_matrix[cur][next] == 0: return False
+            if self._weight(cur, next) == 0: return False
 
         # if we make it through the path in the list moving over and edge at each step return True
         return True
 
+    def validate_paths(self, paths: [], with_weights=False):
+        """
+        This method checks many paths in one call and returns, for each path, whether is_valid_path would accept it.
+        With with_weights it returns a tuple (valid, weights) where weights holds the total edge weight of each valid
+        path and infinity for the invalid ones. With NumPy installed the results are NumPy arrays and every hop of
+        every path is looked up at once in a sorted index of packed src * V + dst edge keys; without NumPy they are
+        lists.
+        """
+        if np is None:
+            return self._validate_paths_loop(paths, with_weights)
+
+        lengths = np.fromiter((len(path) for path in paths), dtype=np.int64, count=len(paths))
+        flat = np.fromiter(chain.from_iterable(paths), dtype=np.int64, count=int(lengths.sum()))
+
+        # a hop goes from flat[k] to flat[k + 1] unless k is the last vertex of its path
+        path_of_vertex = np.repeat(np.arange(len(paths)), lengths)
+        hops = np.flatnonzero(path_of_vertex[:-1] == path_of_vertex[1:])
+        src, dst, path_of_hop = flat[hops], flat[hops + 1], path_of_vertex[hops]
+
+        # look up every hop in the edge index, hops with an end outside the graph are invalid
+        keys, weights = self._packed_edge_index()
+        in_range = (src >= 0) & (src < self.v_count) & (dst >= 0) & (dst < self.v_count)
+        hop_keys = np.where(in_range, src * self.v_count + dst, -1)
+        found = np.minimum(np.searchsorted(keys, hop_keys), max(len(keys) - 1, 0))
+        hop_valid = in_range & (keys[found] == hop_keys) if len(keys) else np.zeros(len(hops), dtype=bool)
+
+        # a path is valid when none of its hops is invalid
+        valid = np.bincount(path_of_hop[~hop_valid], minlength=len(paths)) == 0
+        if not with_weights:
+            return valid
+        totals = np.bincount(path_of_hop[hop_valid], weights=weights[found[hop_valid]], minlength=len(paths))
+        totals = totals.astype(np.float64)
+        totals[~valid] = np.inf
+        return valid, totals
+
+    def _validate_paths_loop(self, paths: [], with_weights=False):
+        """
+        This method is the pure Python version of validate_paths, used when NumPy is not installed.
+        """
+        valid, totals = [], []
+        for path in paths:
+            total = 0
+            for i in range(1, len(path)):
+                cur, next = path[i - 1], path[i]
+                weight = self._weight(cur, next) if 0 <= cur < self.v_count and 0 <= next < self.v_count else 0
+                if weight == 0:
+                    total = float('inf')
+                    break
+                total += weight
+            valid.append(total != float('inf'))
+            totals.append(total)
+        return (valid, totals) if with_weights else valid
+
+    def _packed_edge_index(self):
+        """
+        This method returns two NumPy arrays: the sorted src * V + dst keys of every edge and the matching weights.
+        They are rebuilt only after the graph changes.
+        """
+        if self._edge_index is None or self._edge_index_version != self._version:
+            edges = self.get_edges()
+            keys = np.array([src * self.v_count + dst for src, dst, _ in edges], dtype=np.int64)
+            weights = np.array([weight for _, _, weight in edges], dtype=np.float64)
+            order = np.argsort(keys)
+            self._edge_index = (keys[order], weights[order])
+            self._edge_index_version = self._version
+        return self._edge_index
+
     def dfs(self, v_start, v_end=None) -> []:
         """
         Return list of vertices visited during DFS search
         Vertices are picked in ascending order when presented with multiple options.
         """
-        visited_vertices = []  # Initialize an empty list of visited vertices
-        stack = deque()  # Initialize an empty stack
+        return self._collect('dfs', self.iter_dfs, v_start, v_end)
+
+    def bfs(self, v_start, v_end=None) -> []:
+        """
+        Return list of vertices visited during BFS search
+        Vertices are picked in alphabetical order
+        """
+        return self._collect('bfs', self.iter_bfs, v_start, v_end)
+
+    def bfs_distances(self, sources: [], ordered=False):
+        """
+        This method runs one level-synchronous BFS from all the parameter sources at once and returns the number of
+        hops from the nearest source to every vertex (-1 if unreachable), as a NumPy array when NumPy is installed.
+        Each level is expanded top-down or bottom-up depending on the size of the frontier. With ordered it returns a
+        tuple (distances, order) where order is the visiting order of bfs (for a single source, bfs(src) == order).
+        The search runs on a frozen copy, call it on a FrozenDirectedGraph to avoid rebuilding one per query.
+        """
+        frozen = self.freeze()
+        sources = [src for src in sources if 0 <= src < self.v_count]
+        reverse = None if ordered else frozen.reverse()
+        return frontier_bfs.bfs_levels(frozen.offsets, frozen.targets, sources,
+                                       None if reverse is None else (reverse.offsets, reverse.targets), ordered)
+
+    def iter_dfs(self, v_start, with_info=False):
+        """
+        This method lazily yields the vertices in the same order as dfs in O(V + E) time, so callers can stop early.
+        If with_info is True it yields (vertex, depth, parent) tuples instead, the parent of v_start is None.
+        """
+        visited = set()  # Initialize an empty set of visited vertices
+        stack = deque()  # Initialize an empty stack of (vertex, depth, parent)
 
         # if the starting vertex is in the graph add it to the stack
         if 0 <= v_start < self.v_count:
-            stack.append(v_start)
+            stack.append((v_start, 0, None))
+
         # if the stack is not empty, pop a vertex
         while len(stack) > 0:
-            vertex = stack.pop()
+            vertex, depth, parent = stack.pop()
 
-            # if the vertex is not in the list of visited vertices
-            if vertex not in visited_vertices:
-                visited_vertices.append(vertex)  # add the vertex to the list of visited vertices
+            # skip the vertex if it was already reached through another path
+            if vertex in visited:
+                continue
+            visited.add(vertex)
+            yield (vertex, depth, parent) if with_info else vertex
 
-                # if the vertex popped is the end vertex break
-                if vertex == v_end:
-                    break
-
-                # push each vertex that is a direct successor of the current vertex to the stack
-                for i in range(self.v_count-1, -1, -1):
-                    if self.adj_matrix[vertex][i] != 0:
-                        stack.append(i)
-        return visited_vertices
+            # push each unvisited direct successor of the current vertex to the stack
+            for i in reversed(self._sorted_successors(vertex)):
+                if i not in visited:
+                    stack.append((i, depth + 1, vertex))
 
-    def bfs(self, v_start, v_end=None) -> []:
+    def iter_bfs(self, v_start, with_info=False):
         """
-        Return list of vertices visited during BFS search
-        Vertices are picked in alphabetical order
+        This method lazily yields the vertices in the same order as bfs in O(V + E) time, so callers can stop early.
+        If with_info is True it yields (vertex, depth, parent) tuples instead, the parent of v_start is None.
         """
-        visited_vertices = []  # Initialize an empty list of visited vertices
-        queue = deque()  # Initialize an empty queue
+        # if the starting vertex is not in the graph there is nothing to visit
+        if not 0 <= v_start < self.v_count:
+            return
 
-        # if the starting vertex is in the graph add it to the queue
-        if 0 <= v_start < self.v_count:
-            queue.append(v_start)
+        discovered = {v_start}  # vertices are marked when enqueued so each one is enqueued only once
+        queue = deque([(v_start, 0, None)])  # queue of (vertex, depth, parent)
 
         # if the queue is not empty, dequeue a vertex
         while len(queue) > 0:
-            vertex = queue.popleft()
-
-            # if the vertex is not in the list of visited vertices
-            if vertex not in visited_vertices:
-                visited_vertices.append(vertex)  # add the vertex to the list of visited vertices
-
-                # if the vertex dequeued is the end vertex break
-                if vertex == v_end:
-                    break
+            vertex, depth, parent = queue.popleft()
+            yield (vertex, depth, parent) if with_info else vertex
 
-                # enqueue each vertex that is a direct successor of the current vertex to the queue
-                for i in range(self.v_count):
-                    if self.adj_matrix[vertex][i] != 0:
-                        queue.append(i)
-        return visited_vertices
+            # enqueue each undiscovered direct successor of the current vertex to the queue
+            for i in self._sorted_successors(vertex):
+                if i not in discovered:
+                    discovered.add(i)
+                    queue.append((i, depth + 1, vertex))
 
     def has_cycle(self):
         """
         This method returns True if there is at least one cycle in the graph. If the graph is acyclic,
         the method returns False.
         """
-        stack = []  # initialize an empty stack this stack represents the recursion stack
-        visited = []    # no vertices have been visited thus this list is empty
+        stats = self._start_stats()
+        found = self._find_cycle(stats)
+        self._finish_stats('has_cycle', stats)
+        return found
+
+    def _find_cycle(self, stats=None) -> bool:
+        """
+        This method does the work of has_cycle, filling the parameter stats dict with counters if one is given.
+        """
+        # a maintained topological order proves the graph is acyclic
+        if self._topo is not None:
+            return False
+
+        # white (0) vertices are unvisited, grey (1) ones are on the DFS stack and black (2) ones are finished
+        colour = [0] * self.v_count
 
         # iterate through all the vertices in the graph
-        for vertex in range(self.v_count):
-            # if the vertex has yet to be visited
-            if vertex not in visited:
-                # Check to see if a cycle exists with helper function
-                if self.has_cycle_helper(vertex, visited, stack):
-                    return True
+        for start in range(self.v_count):
+            if colour[start] != 0:
+                continue
+
+            # iterative DFS, each stack entry holds a vertex and an iterator over its remaining successors
+            colour[start] = 1
+            stack = [(start, iter(self._successors(start)))]
+            while stack:
+                vertex, successors = stack[-1]
+                for i, _ in successors:
+                    # an edge back to a vertex on the stack closes a cycle
+                    if colour[i] == 1:
+                        if stats is not None:
+                            stats['vertices_visited'] = self.v_count - colour.count(0)
+                        return True
+                    # descend into the first unvisited successor, the rest are resumed afterwards
+                    if colour[i] == 0:
+                        colour[i] = 1
+                        stack.append((i, iter(self._successors(i))))
+                        if stats is not None:
+                            stats['max_depth'] = max(stats.get('max_depth', 0), len(stack) - 1)
+                        break
+                else:
+                    # every successor is finished so the vertex is too
+                    colour[vertex] = 2
+                    stack.pop()
+        if stats is not None:
+            stats['vertices_visited'] = self.v_count - colour.count(0)
 
         # if we get through all the vertices and haven't found a single cycle return False
         return False
 
-    def has_cycle_helper(self, vertex, visited, stack):
+    def topological_sort(self) -> []:
         """
-        This method takes a vertex, a list of visited vertices and unvisited vertices, and a stack and returns True
-        if the sub_graph with the :param vertex has a cycle. The method returns False otherwise.
+        This method returns the vertices in topological order, every edge goes from an earlier vertex to a later one.
+        If the graph has a cycle there is no such order and the method returns None.
         """
-        stack.append(vertex)     # add the current vertex to the stack
-        # for each vertex in the graph
-        for vertex_i in range(self.v_count):
-            # if the edge exists between that vertex and the current vertex
-            if self.adj_matrix[vertex][vertex_i] != 0:
-                # if the vertex we are looking at has not been visited and is in the stack return True
-                if vertex_i not in visited and vertex_i in stack:
-                    return True
-                # if the vertex we are looking at has not been visited and the recursive call on that vertex is true
-                # return True
-                if vertex_i not in visited and self.has_cycle_helper(vertex_i, visited, stack):
-                    return True
+        # a maintained order is already available
+        if self._topo is not None:
+            return list(self._topo.order)
 
-        stack.remove(vertex)    # remove the current vertex from the stack
-        visited.append(vertex)  # we have now visited this vertex so add it to the visited list
+        # count the incoming edges of every vertex
+        in_degree = [0] * self.v_count
+        for vertex in range(self.v_count):
+            for i, _ in self._successors(vertex):
+                in_degree[i] += 1
+
+        # Kahn's algorithm: repeatedly output a vertex with no remaining incoming edges
+        queue = deque(vertex for vertex in range(self.v_count) if in_degree[vertex] == 0)
+        order = []
+        while queue:
+            vertex = queue.popleft()
+            order.append(vertex)
+            for i, _ in self._successors(vertex):
+                in_degree[i] -= 1
+                if in_degree[i] == 0:
+                    queue.append(i)
+
+        # vertices left out of the order are on or behind a cycle
+        if len(order) < self.v_count:
+            return None
+        return order
 
-        # if we get this far return false
+    def maintain_topological_order(self, reject_cycles=True) -> bool:
+        """
+        This method switches on an online topological order that add_edge keeps up to date, so has_cycle and
+        topological_sort need no full pass. With reject_cycles add_edge ignores edges that would create a cycle,
+        otherwise such an edge is added and the online order is switched off. Returns False if the graph already
+        has a cycle, in which case nothing is switched on.
+        """
+        order = self.topological_sort()
+        if order is None:
+            return False
+        self._topo = TopologicalOrder(order, reject_cycles)
+        return True
+
+    def would_create_cycle(self, src: int, dst: int) -> bool:
+        """
+        This method returns True if adding the edge src -> dst would create a cycle, meaning that src can already be
+        reached from dst. The graph is not changed.
+        """
+        # invalid edges are never added and an existing edge only has its weight updated
+        if src == dst or not (0 <= src < self.v_count and 0 <= dst < self.v_count) or self._weight(src, dst) != 0:
+            return False
+
+        # with a maintained order src sitting before dst proves dst cannot reach src
+        if self._topo is not None and self._topo.position[src] < self._topo.position[dst]:
+            return False
+
+        # otherwise search from dst for src
+        for vertex in self.iter_dfs(dst):
+            if vertex == src:
+                return True
         return False
 
+    def strongly_connected_components(self) -> []:
+        """
+        This method returns the strongly connected components of the graph, each one a sorted list of vertices. Two
+        vertices share a component when each can reach the other, and every cycle lies inside a single component.
+        Components are listed in topological order: an edge between two components always goes from an earlier one
+        to a later one, and the result does not depend on the storage backend. Tarjan's algorithm runs on an explicit
+        stack, so no recursion limit applies, in O(V + E) time on sparse and frozen storage (O(V^2) on the adjacency
+        matrix, which has to scan whole rows).
+        """
+        index = [-1] * self.v_count     # DFS discovery number of every vertex, -1 until it is reached
+        low = [0] * self.v_count        # smallest discovery number reachable from the DFS subtree of the vertex
+        on_stack = bytearray(self.v_count)
+        stack = []                      # vertices whose component is not known yet, in discovery order
+        components = []
+        counter = 0
+
+        for root in range(self.v_count):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, iter(self._sorted_successors(root)))]   # DFS path, with the successors left to look at
+
+            while work:
+                vertex, successors = work[-1]
+                for i in successors:
+                    # descend into an unreached successor, the rest of this vertex is resumed after it
+                    if index[i] == -1:
+                        index[i] = low[i] = counter
+                        counter += 1
+                        stack.append(i)
+                        on_stack[i] = 1
+                        work.append((i, iter(self._sorted_successors(i))))
+                        break
+                    # a successor still on the stack belongs to the component being built
+                    if on_stack[i]:
+                        low[vertex] = min(low[vertex], index[i])
+                else:
+                    # every successor is done, pass the low link up to the parent
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[vertex])
+
+                    # vertex is the first vertex of its component, which is everything above it on the stack
+                    if low[vertex] == index[vertex]:
+                        component = []
+                        while True:
+                            i = stack.pop()
+                            on_stack[i] = 0
+                            component.append(i)
+                            if i == vertex:
+                                break
+                        component.sort()
+                        components.append(component)
+
+        # Tarjan's algorithm completes a component only after every component it reaches, so reverse the list
+        components.reverse()
+        return components
+
+    def condensation(self):
+        """
+        This method returns a tuple (dag, component) where dag is a new SparseDirectedGraph with one vertex per strongly
+        connected component, numbered in the order of strongly_connected_components() (a topological order of dag),
+        and component[v] is the dag vertex of vertex v. dag has an edge between two components when the graph has an
+        edge between them, weighted with the smallest such edge weight. dag has no cycles, so reachability and cycle
+        queries can run on it instead of on the graph.
+        """
+        component = [0] * self.v_count
+        components = self.strongly_connected_components()
+        for c, vertices in enumerate(components):
+            for vertex in vertices:
+                component[vertex] = c
+
+        # keep the lightest edge between every pair of components, edges inside a component disappear
+        lightest = dict()   # Key is a (source component, destination component) pair. Value is the edge weight.
+        for src in range(self.v_count):
+            for dst, weight in self._successors(src):
+                key = component[src], component[dst]
+                if key[0] != key[1] and (key not in lightest or weight < lightest[key]):
+                    lightest[key] = weight
+
+        dag = SparseDirectedGraph()
+        dag.add_vertices(len(components))
+        dag._store_edges([u for u, _ in lightest], [v for _, v in lightest], list(lightest.values()))
+        return dag, component
+
     def dijkstra(self, src: int) -> []:
         """
         This method implements Dijkstra's algorithm to compute the length of the shortest path from the given parameter
@@ -241,38 +987,664 @@ class DirectedGraph:
         between :param src to vertex 0. If a vertex is not reachable its corresponding element in the return list
         will be infinity.
         """
-        # Initialize an empty map/hash table representing visited vertices
-        visited_vertices = {}   # Key is the vertex v. Value is the min distance d to vertex v.
+        # settle every vertex reachable from src, the map holds the min distance to each of them
+        stats = self._start_stats()
+        visited_vertices, _ = self._single_source(src, stats)
+        self._finish_stats('dijkstra', stats)
 
-        # Initialize an empty priority queue, and insert vs into it with distance (priority) 0.
+        # now we must create the return list
+        min_distance_list = []
+        for i in range(self.v_count):
+            if i in visited_vertices:   # if the index has been visited get the distance and append that
+                min_distance_list.append(visited_vertices[i])
+            else:   # otherwise the index cannot be visited from the given start index and thus the distance is infinity
+                min_distance_list.append(float('inf'))
+
+        return min_distance_list
+
+    def shortest_path(self, src: int, dst: int):
+        """
+        This method returns a tuple (distance, path) for the shortest path from src to dst, where path is the list of
+        vertices from src to dst. The search stops as soon as dst is settled. If dst is not reachable the method
+        returns (infinity, []).
+        """
+        # a cached shortest path tree answers the query, otherwise stop the search once dst is settled
+        stats = self._start_stats()
+        if self._path_cache is not None:
+            distances, predecessors = self._single_source(src, stats)
+        else:
+            distances, predecessors = self._dijkstra_search([src], dst, stats)
+        self._finish_stats('shortest_path', stats)
+
+        # dst was never reached
+        if dst not in distances:
+            return float('inf'), []
+
+        # walk the predecessor links back from dst to src
+        return distances[dst], _path_to(predecessors, dst)
+
+    def multi_source_dijkstra(self, sources: []):
+        """
+        This method computes, for every vertex, the distance to the nearest of the parameter source vertices and which
+        source that is. It returns two lists indexed by vertex: the distances (infinity if no source reaches the
+        vertex) and the nearest sources (None if no source reaches the vertex).
+        """
+        stats = self._start_stats()
+        distances, predecessors = self._dijkstra_search(sources, stats=stats)
+        self._finish_stats('multi_source_dijkstra', stats)
+
+        # every source is its own nearest source, every other reached vertex inherits it along the predecessor links
+        nearest = [None] * self.v_count
+        for vertex in distances:
+            if predecessors[vertex] is None:
+                nearest[vertex] = vertex
+        for vertex in distances:
+            path = []
+            while nearest[vertex] is None:
+                path.append(vertex)
+                vertex = predecessors[vertex]
+            for i in path:
+                nearest[i] = nearest[vertex]
+
+        min_distance_list = [distances.get(i, float('inf')) for i in range(self.v_count)]
+        return min_distance_list, nearest
+
+    def bidirectional_dijkstra(self, src: int, dst: int):
+        """
+        This method returns a tuple (distance, path, explored) for the shortest path from src to dst, where explored
+        is the number of vertices settled. Dijkstra's algorithm runs forward from src and backward from dst over the
+        reverse adjacency index of the frozen copy (built once per graph version), always advancing the side with the
+        smaller tentative distance, and stops once no path through an unsettled vertex can beat the best one found.
+        Both searches stay close to their end, so far fewer vertices are settled than by shortest_path on large
+        graphs. If dst is not reachable the method returns (infinity, [], explored).
+        """
+        if not (0 <= src < self.v_count and 0 <= dst < self.v_count):
+            return float('inf'), [], 0
+
+        stats = self._start_stats()
+        frozen = self.freeze()
+        graphs = (frozen, frozen.reverse())     # successors for the forward search, predecessors for the backward one
+        distances = ({src: 0}, {dst: 0})
+        predecessors = ({src: None}, {dst: None})
+        queues = ([(0, src)], [(0, dst)])
+        best, meet = (0, src) if src == dst else (float('inf'), None)
+        explored = 0
+
+        # stop when the two smallest tentative distances add up to no less than the best path, every path through an
+        # unsettled vertex is at least that long
+        while queues[0] and queues[1] and queues[0][0][0] + queues[1][0][0] < best:
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            distance, vertex = heapq.heappop(queues[side])
+            if distance > distances[side][vertex]:
+                continue    # stale entry
+            explored += 1
+
+            seen, other = distances[side], distances[1 - side]
+            for i, weight in graphs[side]._successors(vertex):
+                new_distance = distance + weight
+                if i not in seen or new_distance < seen[i]:
+                    seen[i] = new_distance
+                    predecessors[side][i] = vertex
+                    heapq.heappush(queues[side], (new_distance, i))
+                    # i has been reached from both ends, which gives a candidate path
+                    if i in other and new_distance + other[i] < best:
+                        best, meet = new_distance + other[i], i
+
+        if stats is not None:
+            stats['vertices_settled'] = explored
+        self._finish_stats('bidirectional_dijkstra', stats)
+        if meet is None:
+            return float('inf'), [], explored
+        return best, _path_to(predecessors[0], meet) + _path_to(predecessors[1], meet)[-2::-1], explored
+
+    def astar(self, src: int, dst: int, heuristic):
+        """
+        This method returns a tuple (distance, path, explored) for the shortest path from src to dst found by A*
+        search, where explored is the number of vertices expanded. heuristic(vertex, dst) must never overestimate the
+        distance from vertex to dst (admissible), the closer it is to that distance the fewer vertices are explored.
+        A heuristic of 0 gives Dijkstra's algorithm. If dst is not reachable the method returns (infinity, [], explored).
+        """
+        if not (0 <= src < self.v_count and 0 <= dst < self.v_count):
+            return float('inf'), [], 0
+
+        stats = self._start_stats()
+        distances = {src: 0}        # Key is the vertex v. Value is the best known distance from src to v.
+        predecessors = {src: None}  # Key is the vertex v. Value is the vertex before v on that path.
+        priority_queue = [(heuristic(src, dst), 0, src)]   # entries are (distance + estimate, distance, vertex)
+        explored = 0
+        result = float('inf'), []
+
+        while priority_queue:
+            _, distance, vertex = heapq.heappop(priority_queue)
+            if distance > distances[vertex]:
+                continue    # stale entry
+            explored += 1
+
+            # with an admissible heuristic the first time dst leaves the queue its distance is the shortest one
+            if vertex == dst:
+                result = distance, _path_to(predecessors, dst)
+                break
+
+            # a vertex is pushed again whenever a shorter path to it is found, so inconsistent heuristics stay correct
+            for i, weight in self._successors(vertex):
+                new_distance = distance + weight
+                if i not in distances or new_distance < distances[i]:
+                    distances[i] = new_distance
+                    predecessors[i] = vertex
+                    heapq.heappush(priority_queue, (new_distance + heuristic(i, dst), new_distance, i))
+
+        if stats is not None:
+            stats['vertices_settled'] = explored
+        self._finish_stats('astar', stats)
+        return result + (explored,)
+
+    def enable_path_cache(self, max_entries=128, max_bytes=None) -> None:
+        """
+        This method switches on caching of single source results (distances and predecessor trees) used by dijkstra
+        and shortest_path. At most max_entries sources, and about max_bytes bytes if given, are kept in least recently
+        used order. Any add_vertex, add_edge or remove_edge empties the cache.
+        """
+        self._path_cache = ShortestPathCache(max_entries, max_bytes)
+
+    def disable_path_cache(self) -> None:
+        """
+        This method switches off the shortest path cache and frees its entries.
+        """
+        self._path_cache = None
+
+    def path_cache_stats(self) -> dict:
+        """
+        This method returns the hit, miss, eviction and invalidation counters and the current size of the shortest
+        path cache, or None if the cache is off.
+        """
+        if self._path_cache is None:
+            return None
+        return self._path_cache.stats()
+
+    def _single_source(self, src: int, stats=None):
+        """
+        This method returns the (distances, predecessors) maps of a full Dijkstra search from src, from the cache
+        when possible.
+        """
+        cache = self._path_cache
+        if cache is None:
+            return self._dijkstra_search([src], stats=stats)
+
+        result = cache.get(src, self._version)
+        if result is None:
+            result = self._dijkstra_search([src], stats=stats)
+            cache.put(src, self._version, *result)
+        return result
+
+    def _dijkstra_search(self, sources: [], target=None, stats=None):
+        """
+        This method runs Dijkstra's algorithm from all the parameter sources at once and stops early once target is
+        settled. It returns two maps keyed by reached vertex: the best known distance and the predecessor on that
+        path (None for sources). Without a target every reachable vertex is settled so the distances are final.
+        A vertex is only pushed onto the priority queue when its distance improves, which keeps the queue small.
+        If a stats dict is given the search counters are added to it.
+        """
+        distances = {}      # Key is the vertex v. Value is the best known distance d to vertex v.
+        predecessors = {}   # Key is the vertex v. Value is the vertex before v on that path.
+
+        # Initialize the priority queue with every valid source at distance (priority) 0.
         priority_queue = []
+        for src in sources:
+            if 0 <= src < self.v_count and src not in distances:
+                distances[src] = 0
+                predecessors[src] = None
+                priority_queue.append((0, src))
         heapq.heapify(priority_queue)
-        heapq.heappush(priority_queue, (0, src))
+        pushes, stale, settled, relaxed = len(priority_queue), 0, 0, 0     # counters, cheap enough to always keep
 
         # While the priority queue is not empty:
         while len(priority_queue) > 0:
             # Remove the min element in the priority queue
             distance, vertex = heapq.heappop(priority_queue)
 
-            # if the vertex has not been visited
-            if vertex not in visited_vertices:
-                visited_vertices[vertex] = distance     # Add vertex to the visited map
+            # skip stale entries whose vertex was already settled through a shorter path
+            if distance > distances[vertex]:
+                stale += 1
+                continue
+            settled += 1
 
-                # For each direct successor i of vertex:
-                for i in range(self.v_count):
-                    if self.adj_matrix[vertex][i] != 0:
-                        # insert i into the priority queue
-                        heapq.heappush(priority_queue, (distance + self.adj_matrix[vertex][i], i))
+            # the target is settled so its distance and path are final
+            if vertex == target:
+                break
 
-        # now we must create the return list
-        min_distance_list = []
+            # For each direct successor i of vertex, push it only if this path improves on the best known one
+            if stats is not None:
+                relaxed += self.degree(vertex)
+            for i, weight in self._successors(vertex):
+                new_distance = distance + weight
+                if i not in distances or new_distance < distances[i]:
+                    distances[i] = new_distance
+                    predecessors[i] = vertex
+                    heapq.heappush(priority_queue, (new_distance, i))
+                    pushes += 1
+
+        if stats is not None:
+            for name, value in (('vertices_settled', settled), ('edges_relaxed', relaxed), ('heap_pushes', pushes),
+                                ('heap_pops', pushes - len(priority_queue)), ('stale_entries_skipped', stale)):
+                stats[name] = stats.get(name, 0) + value
+        return distances, predecessors
+
+    def all_pairs_shortest_paths(self, strategy='auto', processes=None):
+        """
+        This method returns the shortest distance between every pair of vertices as a V x V table where row i is
+        dijkstra(i) as floats. The table is a NumPy array when NumPy is installed and a list of array('d') rows otherwise.
+        strategy is 'floyd_warshall' (vectorised with NumPy, best for dense graphs), 'dijkstra' (one search per source
+        spread over a pool of processes, best for sparse graphs) or 'auto' to choose from the edge density.
+        processes is the largest pool size, os.cpu_count() if None and no pool at all if 1. Graphs too small to pay for
+        a pool (see PARALLEL_MIN_WORK) are searched in the calling process.
+        """
+        if strategy == 'auto':
+            edge_count = sum(len(list(self._successors(vertex))) for vertex in range(self.v_count))
+            dense = self.v_count > 0 and edge_count >= DENSE_GRAPH_DENSITY * self.v_count ** 2
+            strategy = 'floyd_warshall' if dense and np is not None else 'dijkstra'
+
+        if strategy == 'floyd_warshall':
+            return self._floyd_warshall()
+        if strategy == 'dijkstra':
+            return self._repeated_dijkstra(processes)
+        raise ValueError(f'unknown all pairs shortest paths strategy: {strategy!r}')
+
+    def _floyd_warshall(self):
+        """
+        This method runs Floyd-Warshall with every relaxation round done as one NumPy operation over the whole matrix.
+        """
+        if np is None:
+            raise ImportError('the floyd_warshall strategy requires NumPy')
+
+        # start from the weight matrix with infinity where there is no edge and 0 on the diagonal
+        distances = np.array([self._row(vertex) for vertex in range(self.v_count)], dtype=np.float64)
+        distances = distances.reshape(self.v_count, self.v_count)
+        distances[distances == 0] = np.inf
+        np.fill_diagonal(distances, 0)
+
+        # allow paths through vertex k, for one k at a time
+        for k in range(self.v_count):
+            np.minimum(distances, distances[:, k, None] + distances[None, k, :], out=distances)
+        return distances
+
+    def _repeated_dijkstra(self, processes=None):
+        """
+        This method runs dijkstra from every vertex, spread over a pool of processes that each get a frozen copy of
+        the graph. Small graphs are searched in the calling process.
+        """
+        if processes is None:
+            processes = os.cpu_count() or 1
+        processes = min(processes, self.v_count * (self.v_count + self.edge_count()) // PARALLEL_MIN_WORK)
+        sources = range(self.v_count)
+
+        if processes <= 1:
+            rows = [self.dijkstra(src) for src in sources]
+        else:
+            # hand out the sources in chunks so each task is big enough to pay for its inter-process round trip
+            chunk = max(1, self.v_count // (processes * 4))
+            chunks = [sources[i:i + chunk] for i in range(0, self.v_count, chunk)]
+            with ProcessPoolExecutor(processes, initializer=_init_worker_graph, initargs=(self.freeze(),)) as pool:
+                rows = [row for rows in pool.map(_dijkstra_rows, chunks) for row in rows]
+
+        if np is not None:
+            return np.array(rows, dtype=np.float64).reshape(self.v_count, self.v_count)
+        return [array('d', row) for row in rows]
+
+    def freeze(self) -> 'FrozenDirectedGraph':
+        """
+        This method returns a read-only copy of the graph stored in compressed sparse row (CSR) form. The successors of
+        each vertex are kept in ascending order so traversals of the copy need no sorting. The copy never changes, so
+        any number of threads can read it without locking while this graph keeps being written. It is built once per
+        graph version: freezing again without a mutation in between returns the same copy.
+        """
+        if self._frozen is not None and self._frozen_version == self._version:
+            return self._frozen
+
+        offsets = array('q', [0])   # offsets[v]:offsets[v + 1] is the slice of targets holding the successors of v
+        targets = array('i')
+        weights = []
+
+        # append the successors of every vertex in ascending order
+        for vertex in range(self.v_count):
+            for i, weight in sorted(self._successors(vertex)):
+                targets.append(i)
+                weights.append(weight)
+            offsets.append(len(targets))
+
+        # keep integer weights as integers so distances keep the same type as the source graph, a single float weight
+        # makes them all floats
+        typecode = 'q' if all(isinstance(weight, int) for weight in weights) else 'd'
+        self._frozen = FrozenDirectedGraph(self.v_count, offsets, targets, array(typecode, weights))
+        self._frozen_version = self._version
+        return self._frozen
+
+    def save(self, path) -> None:
+        """
+        This method writes the graph to path in the binary CSR format of graph_format, see load.
+        """
+        frozen = self.freeze()
+        graph_format.save(path, graph_format.DIRECTED, frozen.v_count, frozen.offsets, frozen.targets, frozen.weights)
+
+    @classmethod
+    def load(cls, path, mmap=True) -> 'FrozenDirectedGraph':
+        """
+        This method reads a graph written by save and returns it as a FrozenDirectedGraph. With mmap the file is mapped
+        read-only and every method, dijkstra included, runs directly on the mapped arrays without copying them, so
+        processes loading the same file share a single copy of it in memory.
+        """
+        data = graph_format.load(path, mmap)
+        if data.kind != graph_format.DIRECTED:
+            raise ValueError(f'{path} does not hold a directed graph')
+        return FrozenDirectedGraph(data.v_count, data.offsets, data.targets, data.weights)
+
+    def _topo_insert(self, src: int, dst: int) -> bool:
+        """
+        This method updates the online topological order for a new edge src -> dst. It returns False if add_edge must
+        ignore the edge because it would create a cycle.
+        """
+        if self._topo.insert_edge(self, src, dst):
+            return True
+        # the edge closes a cycle: reject it, or accept it and stop keeping an order that can no longer exist
+        if self._topo.reject_cycles:
+            return False
+        self._topo = None
+        return True
+
+    def _successors(self, vertex: int):
+        """
+        This method returns the (successor, weight) pairs of the parameter vertex. The pairs of the adjacency matrix
+        are in ascending order, other storage backends make no ordering promise.
+        """
+        return [(i, weight) for i, weight in enumerate(self.adj_matrix[vertex]) if weight != 0]
+
+    def _sorted_successors(self, vertex: int):
+        """
+        This method returns the successors of the parameter vertex in ascending order, the order dfs and bfs visit
+        them in. The adjacency matrix is scanned in that order already, so nothing is sorted here.
+        """
+        return [i for i, weight in enumerate(self.adj_matrix[vertex]) if weight != 0]
+
+    def _weight(self, src: int, dst: int):
+        """
+        This method returns the weight of the edge from src to dst or 0 if there is no such edge.
+        """
+        return self.adj_matrix[src][dst]
+
+    def _row(self, vertex: int) -> []:
+        """
+        This method returns the row of the adjacency matrix for the parameter vertex.
+        """
+        return self.adj_matrix[vertex]
+
+
+class SparseDirectedGraph(DirectedGraph):
+    """
+    Directed weighted graph stored as a list of dictionaries, one per vertex, mapping each successor to the edge weight.
+    Memory is O(V + E) and every method runs in time proportional to the edges it looks at instead of V^2.
+    """
+
+    # sorted successor tuples for dfs and bfs, key is a vertex, an entry is dropped when an edge out of it changes
+    _sorted_cache = None
+
+    def __init__(self, start_edges=None):
+        """
+        Store graph info as adjacency dictionaries
+        """
+        self.adj_list = []
+        super().__init__(start_edges)
+        del self.adj_matrix     # the dense matrix is never built for this backend
+
+    def __str__(self):
+        """
+        Return content of the graph in the same human-readable form as DirectedGraph
+        """
+        if self.v_count == 0:
+            return 'EMPTY GRAPH\n'
+        out = '   |'
+        out += ' '.join(['{:2}'.format(i) for i in range(self.v_count)]) + '\n'
+        out += '-' * (self.v_count * 3 + 3) + '\n'
         for i in range(self.v_count):
-            if i in visited_vertices:   # if the index has been visited get the distance and append that
-                min_distance_list.append(visited_vertices[i])
-            else:   # otherwise the index cannot be visited from the given start index and thus the distance is infinity
-                min_distance_list.append(float('inf'))
+            row = self._row(i)
+            out += '{:2} |'.format(i)
+            out += ' '.join(['{:2}'.format(w) for w in row]) + '\n'
+        out = f"GRAPH ({self.v_count} vertices):\n{out}"
+        return out
 
-        return min_distance_list
+    def add_vertex(self) -> int:
+        """
+        This method adds a new vertex with no edges to the graph and returns the number of vertices after addition.
+        """
+        self.v_count += 1
+        self.adj_list.append({})
+        if self._topo is not None:
+            self._topo.append(self.v_count - 1)
+        self._version += 1
+        return self.v_count
+
+    def add_vertices(self, n: int) -> int:
+        """
+        This method adds n new vertices with no edges and returns the number of vertices after addition.
+        """
+        if n <= 0:
+            return self.v_count
+        self.adj_list.extend({} for _ in range(n))
+        self.v_count += n
+        if self._topo is not None:
+            for vertex in range(self.v_count - n, self.v_count):
+                self._topo.append(vertex)
+        self._version += 1
+        return self.v_count
+
+    def add_edge(self, src: int, dst: int, weight=1) -> None:
+        """
+        This method adds a new edge to the graph or updates the weight of an existing one.
+        """
+        # same rules as the adjacency matrix: no loops, no negative weights and both vertices must exist
+        if src == dst or weight < 0 or not (0 <= src < self.v_count and 0 <= dst < self.v_count):
+            return
+
+        # no change to the stored weight (a weight of 0 for a missing edge included), nothing to invalidate
+        if self.adj_list[src].get(dst, 0) == weight:
+            return
+
+        if self._topo is not None and weight != 0 and not self._topo_insert(src, dst):
+            return
+
+        # a weight of 0 means "no edge" in the adjacency matrix, so it removes the edge here
+        self._edge_count -= dst in self.adj_list[src]
+        if weight == 0:
+            self.adj_list[src].pop(dst, None)
+        else:
+            self.adj_list[src][dst] = weight
+            self._edge_count += 1
+        if self._sorted_cache is not None:
+            self._sorted_cache.pop(src, None)
+        self._version += 1
+
+    def remove_edge(self, src: int, dst: int) -> None:
+        """
+        This method removes the edge between the two parameter vertices.
+        """
+        if src == dst or not (0 <= src < self.v_count and 0 <= dst < self.v_count) or dst not in self.adj_list[src]:
+            return
+
+        del self.adj_list[src][dst]
+        self._edge_count -= 1
+        if self._sorted_cache is not None:
+            self._sorted_cache.pop(src, None)
+        self._version += 1
+
+    def _store_edges(self, src: [], dst: [], weight: []) -> None:
+        adj_list, v_count = self.adj_list, self.v_count
+        for u, v, w in zip(src, dst, weight):
+            if u != v and w >= 0 and 0 <= u < v_count and 0 <= v < v_count:
+                if w == 0:
+                    adj_list[u].pop(v, None)
+                else:
+                    adj_list[u][v] = w
+        self._edge_count = sum(len(successors) for successors in adj_list)
+        self._sorted_cache = None
+        self._version += 1
+
+    def degree(self, vertex: int) -> int:
+        if not 0 <= vertex < self.v_count:
+            return 0
+        return len(self.adj_list[vertex])
+
+    def _successors(self, vertex: int):
+        return self.adj_list[vertex].items()
+
+    def _sorted_successors(self, vertex: int):
+        # sort each successor dict once and reuse it until an edge of that vertex changes
+        if self._sorted_cache is None:
+            self._sorted_cache = dict()
+        successors = self._sorted_cache.get(vertex)
+        if successors is None:
+            successors = self._sorted_cache[vertex] = tuple(sorted(self.adj_list[vertex]))
+        return successors
+
+    def _weight(self, src: int, dst: int):
+        return self.adj_list[src].get(dst, 0)
+
+    def _row(self, vertex: int) -> []:
+        row = [0] * self.v_count
+        for i, weight in self.adj_list[vertex].items():
+            row[i] = weight
+        return row
+
+
+class FrozenDirectedGraph(DirectedGraph):
+    """
+    Read-only directed weighted graph in compressed sparse row (CSR) form, built with DirectedGraph.freeze().
+    The successors of vertex v are targets[offsets[v]:offsets[v + 1]] in ascending order with the matching weights.
+    """
+
+    def __init__(self, v_count: int, offsets, targets, weights):
+        """
+        Store graph info as CSR arrays
+        """
+        self.v_count = v_count
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self._reverse = None    # transposed graph, built on first use
+
+    __str__ = SparseDirectedGraph.__str__
+
+    def __getstate__(self):
+        """
+        Copy arrays that are views of a memory mapped file into plain arrays so the graph can be pickled
+        """
+        state = dict(self.__dict__)
+        state['_reverse'] = None
+        for name in ('offsets', 'targets', 'weights'):
+            if isinstance(state[name], memoryview):
+                state[name] = array(state[name].format, state[name].tobytes())
+        return state
+
+    def add_vertex(self) -> int:
+        raise TypeError('FrozenDirectedGraph is read-only')
+
+    def add_vertices(self, n: int) -> int:
+        raise TypeError('FrozenDirectedGraph is read-only')
+
+    def add_edge(self, src: int, dst: int, weight=1) -> None:
+        raise TypeError('FrozenDirectedGraph is read-only')
+
+    def remove_edge(self, src: int, dst: int) -> None:
+        raise TypeError('FrozenDirectedGraph is read-only')
+
+    def freeze(self) -> 'FrozenDirectedGraph':
+        return self
+
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def reverse(self) -> 'FrozenDirectedGraph':
+        """
+        This method returns the graph with every edge reversed, so the successors of v in it are the predecessors of v
+        in this graph (in ascending order). It is built once, with a counting sort over the edges, and then cached.
+        """
+        if self._reverse is None:
+            # count the incoming edges of every vertex and turn the counts into slice offsets
+            offsets = array('q', [0]) * (self.v_count + 1)
+            for i in self.targets:
+                offsets[i + 1] += 1
+            for i in range(self.v_count):
+                offsets[i + 1] += offsets[i]
+
+            # place every edge in the slice of its destination, sources are visited in ascending order
+            fill = array('q', offsets[:self.v_count])
+            targets = array('i', [0]) * len(self.targets)
+            weights = array(self.weights.format if isinstance(self.weights, memoryview) else self.weights.typecode,
+                            [0]) * len(self.targets)
+            for vertex in range(self.v_count):
+                for k in range(self.offsets[vertex], self.offsets[vertex + 1]):
+                    i = self.targets[k]
+                    targets[fill[i]] = vertex
+                    weights[fill[i]] = self.weights[k]
+                    fill[i] += 1
+
+            self._reverse = FrozenDirectedGraph(self.v_count, offsets, targets, weights)
+            self._reverse._reverse = self
+        return self._reverse
+
+    def degree(self, vertex: int) -> int:
+        if not 0 <= vertex < self.v_count:
+            return 0
+        return self.offsets[vertex + 1] - self.offsets[vertex]
+
+    def _successors(self, vertex: int):
+        lo, hi = self.offsets[vertex], self.offsets[vertex + 1]
+        return zip(self.targets[lo:hi], self.weights[lo:hi])
+
+    def _sorted_successors(self, vertex: int):
+        # the CSR slices are stored in ascending order
+        return self.targets[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+    def _weight(self, src: int, dst: int):
+        # binary search the sorted successors of src for dst
+        lo, hi = self.offsets[src], self.offsets[src + 1]
+        i = bisect_left(self.targets, dst, lo, hi)
+        if i < hi and self.targets[i] == dst:
+            return self.weights[i]
+        return 0
+
+    def _row(self, vertex: int) -> []:
+        row = [0] * self.v_count
+        for i, weight in self._successors(vertex):
+            row[i] = weight
+        return row
+
+
+# graph shared by the functions below inside pool worker processes
+_worker_graph = None
+
+
+def _path_to(predecessors: dict, vertex: int) -> []:
+    """
+    Return the path from the root of a predecessor map (the vertex whose predecessor is None) to vertex
+    """
+    path = [vertex]
+    while predecessors[path[-1]] is not None:
+        path.append(predecessors[path[-1]])
+    path.reverse()
+    return path
+
+
+def _init_worker_graph(graph) -> None:
+    """
+    Pool initializer that stores the graph sent to a worker process
+    """
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _dijkstra_rows(sources) -> []:
+    """
+    Return the dijkstra distance list of every source in sources, run inside a pool worker process
+    """
+    return [_worker_graph.dijkstra(src) for src in sources]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,162 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Level-synchronous, direction-optimizing breadth first search over graphs in CSR form.
+
+try:
+    import numpy as np
+except ImportError:     # NumPy is optional, a pure Python top-down search is used without it
+    np = None
+
+# switch to bottom-up once the frontier has more than 1/ALPHA of the unexplored edges, and back to top-down once it
+# holds less than 1/BETA of the vertices (the thresholds of Beamer et al.)
+ALPHA = 14
+BETA = 24
+
+# top-down levels whose frontier has fewer edges than this are expanded in a plain Python loop, the fixed cost of the
+# NumPy calls of a level only pays off for larger frontiers (long, thin graphs such as road networks have thousands of
+# tiny levels)
+VECTOR_MIN_EDGES = 1 << 7
+
+
+def bfs_levels(offsets, targets, sources: [], reverse=None, ordered=False):
+    """
+    Return the hop distance from the nearest source to every vertex (-1 if unreachable) of a CSR graph
+    - the neighbours of vertex v are targets[offsets[v]:offsets[v + 1]]
+    - reverse is the (offsets, targets) CSR of the incoming edges, it enables bottom-up steps (pass the same arrays
+      for an undirected graph, or None for top-down only)
+    - with ordered the result is a tuple (distances, order) where order lists the vertices in the order a queue based
+      BFS started from the sources in the given order would visit them, which only needs top-down steps
+    Distances are a NumPy int64 array when NumPy is installed and a list otherwise.
+    """
+    if np is None:
+        return _bfs_levels_python(offsets, targets, sources, ordered)
+
+    offsets = np.frombuffer(offsets, dtype=np.int64) if not isinstance(offsets, np.ndarray) else offsets
+    targets = np.frombuffer(targets, dtype=np.int32) if not isinstance(targets, np.ndarray) else targets
+    n = len(offsets) - 1
+    if reverse is not None and not ordered:
+        reverse_offsets = np.frombuffer(reverse[0], dtype=np.int64)
+        reverse_targets = np.frombuffer(reverse[1], dtype=np.int32)
+    else:
+        reverse = None
+
+    distances = np.full(n, -1, dtype=np.int64)
+    frontier = _first_occurrences(np.asarray(sources, dtype=np.int64))
+    distances[frontier] = 0
+    order = frontier.tolist()
+    frontier_edges = int((offsets[frontier + 1] - offsets[frontier]).sum())
+    unexplored_edges = len(targets) - frontier_edges
+    # plain Python views for the small levels, indexing them yields ints instead of NumPy scalars
+    offsets_view, targets_view, distances_view = memoryview(offsets), memoryview(targets), memoryview(distances)
+    bottom_up = False
+    level = 0
+
+    while len(frontier) > 0:
+        level += 1
+
+        # choose the direction of this step from the size of the frontier
+        if reverse is not None:
+            if not bottom_up and frontier_edges > unexplored_edges / ALPHA:
+                bottom_up = True
+            elif bottom_up and len(frontier) < n / BETA:
+                bottom_up = False
+
+        if bottom_up:
+            # every unvisited vertex looks for an incoming edge from the frontier
+            in_frontier = np.zeros(n, dtype=bool)
+            in_frontier[frontier] = True
+            candidates = np.flatnonzero(distances == -1)
+            owners, neighbors = _gather(reverse_offsets, reverse_targets, candidates)
+            hits = np.bincount(owners[in_frontier[neighbors]], minlength=len(candidates))
+            frontier = candidates[hits > 0]
+        elif frontier_edges < VECTOR_MIN_EDGES:
+            # a small frontier costs less to expand in a plain loop than in a dozen NumPy calls
+            frontier, frontier_edges = _expand(offsets_view, targets_view, distances_view, frontier, level)
+            unexplored_edges -= frontier_edges
+            if ordered:
+                order.extend(frontier)
+            continue
+        else:
+            # every frontier vertex expands its outgoing edges, in frontier order then neighbour order
+            _, neighbors = _gather(offsets, targets, np.asarray(frontier, dtype=np.int64))
+            neighbors = neighbors[distances[neighbors] == -1]
+            frontier = _first_occurrences(neighbors) if ordered else np.unique(neighbors)
+
+        distances[frontier] = level
+        frontier_edges = int((offsets[frontier + 1] - offsets[frontier]).sum())
+        unexplored_edges -= frontier_edges
+        if ordered:
+            order.extend(frontier.tolist())
+
+    if ordered:
+        return distances, order
+    return distances
+
+
+def _expand(offsets, targets, distances, frontier, level: int):
+    """
+    Give the undiscovered neighbours of the frontier vertices distance level, in frontier order then neighbour order,
+    and return them as the next frontier with the number of edges leaving it
+    """
+    next_frontier = []
+    edges = 0
+    for vertex in frontier:
+        for i in targets[offsets[vertex]:offsets[vertex + 1]]:
+            if distances[i] == -1:
+                distances[i] = level
+                next_frontier.append(i)
+                edges += offsets[i + 1] - offsets[i]
+    return next_frontier, edges
+
+
+def _gather(offsets, targets, vertices):
+    """
+    Return (owners, neighbors) listing every neighbour of the given vertices, owners[k] being the position in vertices
+    of the vertex neighbors[k] belongs to
+    """
+    starts = offsets[vertices]
+    counts = offsets[vertices + 1] - starts
+    owners = np.repeat(np.arange(len(vertices)), counts)
+    # position of every gathered neighbour in targets: the start of its slice plus its rank inside the slice
+    slice_starts = np.cumsum(counts) - counts
+    positions = starts[owners] + np.arange(len(owners)) - slice_starts[owners]
+    return owners, targets[positions]
+
+
+def _first_occurrences(values):
+    """
+    Return values without duplicates, each value kept at its first position
+    """
+    _, first = np.unique(values, return_index=True)
+    return values[np.sort(first)]
+
+
+def _bfs_levels_python(offsets, targets, sources: [], ordered=False):
+    """
+    Pure Python top-down version of bfs_levels
+    """
+    n = len(offsets) - 1
+    distances = [-1] * n
+    frontier = []
+    for src in sources:
+        if distances[src] == -1:
+            distances[src] = 0
+            frontier.append(src)
+    order = list(frontier)
+
+    level = 0
+    while frontier:
+        level += 1
+        next_frontier = []
+        for vertex in frontier:
+            for i in targets[offsets[vertex]:offsets[vertex + 1]]:
+                if distances[i] == -1:
+                    distances[i] = level
+                    next_frontier.append(i)
+        frontier = next_frontier
+        order.extend(frontier)
+
+    if ordered:
+        return distances, order
+    return distances
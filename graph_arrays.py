@@ -0,0 +1,13 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Conversions between NumPy arrays and plain Python sequences shared by the graph classes.
+
+
+def as_list(values) -> []:
+    """
+    Return the values of a NumPy array or any other iterable as a list of plain Python objects
+    """
+    if hasattr(values, 'tolist'):
+        return values.tolist()
+    return list(values)
@@ -0,0 +1,217 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Batched, deduplicated execution of read queries on a thread or process pool, with asyncio support.
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import graph_format
+from d_graph import DirectedGraph, FrozenDirectedGraph
+from ud_graph import CompactUndirectedGraph
+
+# read methods a query may call, a query is a tuple (method, *args) such as ('dfs', 0), ('bfs', 'A', 'C'),
+# ('dijkstra', 3) or ('shortest_path', 0, 4)
+QUERY_METHODS = frozenset(['dfs', 'bfs', 'dijkstra', 'shortest_path', 'bidirectional_dijkstra', 'bidirectional_bfs',
+                           'bfs_distances', 'is_valid_path', 'same_component', 'count_connected_components',
+                           'has_cycle'])
+
+
+class QueryExecutor:
+    """
+    Runs batches of read queries against a frozen snapshot of a graph
+    - identical queries of a batch (and identical async queries in flight at the same time) are run only once, they
+      share the same result object
+    - queries run on a thread pool, or with processes=True on a process pool whose workers map the snapshot from
+      shared memory instead of each receiving a pickled copy
+    - the async methods hand the work to the pool so an asyncio event loop is never blocked
+    The snapshot is taken when the executor is created, call refresh() to pick up later changes of the graph.
+    """
+
+    def __init__(self, graph, max_workers=None, processes=False, chunk_size=None):
+        """
+        Freeze the graph and start the pool
+        chunk_size is the number of queries sent to a worker at once, by default a batch is split in about four chunks
+        per worker
+        """
+        self.graph = graph
+        self.max_workers = max_workers
+        self.processes = processes
+        self.chunk_size = chunk_size
+        self._inflight = dict()     # Key is a query. Value is the asyncio future of the running query.
+        self._memory = None
+        self._pool = None
+        self._start()
+
+    def __enter__(self) -> 'QueryExecutor':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def run(self, queries: []) -> []:
+        """
+        Run a batch of queries and return their results in the same order
+        """
+        keys, unique = self._deduplicate(queries)
+        futures = [self._pool.submit(_run_queries, chunk, graph) for chunk, graph in self._submission(unique)]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return [results[key] for key in keys]
+
+    async def run_async(self, queries: []) -> []:
+        """
+        Awaitable version of run, the queries run on the pool while the event loop keeps serving other tasks
+        """
+        keys, unique = self._deduplicate(queries)
+        loop = asyncio.get_running_loop()
+        chunks = [loop.run_in_executor(self._pool, _run_queries, chunk, graph)
+                  for chunk, graph in self._submission(unique)]
+        results = []
+        for chunk_results in await asyncio.gather(*chunks):
+            results.extend(chunk_results)
+        return [results[key] for key in keys]
+
+    async def query(self, method: str, *args):
+        """
+        Run a single query without blocking the event loop
+        Concurrent calls with the same query wait for the same run instead of starting another one
+        """
+        query = _normalize((method,) + args)
+        self._check(query)
+        future = self._inflight.get(query)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            chunk, graph = self._submission([query])[0]
+            future = loop.run_in_executor(self._pool, _run_queries, chunk, graph)
+            self._inflight[query] = future
+            future.add_done_callback(lambda _: self._inflight.pop(query, None))
+        return (await asyncio.shield(future))[0]
+
+    async def dfs(self, v_start, v_end=None) -> []:
+        return await self.query('dfs', v_start, v_end)
+
+    async def bfs(self, v_start, v_end=None) -> []:
+        return await self.query('bfs', v_start, v_end)
+
+    async def dijkstra(self, src: int) -> []:
+        return await self.query('dijkstra', src)
+
+    async def shortest_path(self, src: int, dst: int):
+        return await self.query('shortest_path', src, dst)
+
+    def refresh(self) -> None:
+        """
+        Take a new snapshot of the graph if it changed since the last one, restarting the pool for processes
+        """
+        if self.graph.freeze() is self.snapshot:
+            return
+        self.close()
+        self._start()
+
+    def close(self) -> None:
+        """
+        Stop the pool and release the shared memory
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._memory is not None:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+    def _start(self) -> None:
+        """
+        Freeze the graph and start a pool reading the snapshot
+        """
+        self.snapshot = self.graph.freeze()
+        if not self.processes:
+            self._pool = ThreadPoolExecutor(self.max_workers)
+            return
+
+        # copy the snapshot once into shared memory, every worker maps it without copying
+        snapshot = self.snapshot
+        if isinstance(snapshot, DirectedGraph):
+            data = graph_format.pack(graph_format.DIRECTED, snapshot.v_count, snapshot.offsets, snapshot.targets,
+                                     snapshot.weights)
+        else:
+            data = graph_format.pack(graph_format.UNDIRECTED, len(snapshot.names), snapshot.offsets,
+                                     snapshot.neighbors, names=snapshot.names)
+        self._memory = shared_memory.SharedMemory(create=True, size=len(data))
+        self._memory.buf[:len(data)] = data
+        self._pool = ProcessPoolExecutor(self.max_workers, initializer=_init_worker, initargs=(self._memory.name,))
+
+    def _deduplicate(self, queries: []):
+        """
+        Return the position of every query in the list of unique queries, and that list
+        """
+        positions = dict()  # Key is a query. Value is its position in the unique queries.
+        keys = []
+        for query in queries:
+            query = _normalize(query)
+            if query not in positions:
+                self._check(query)
+                positions[query] = len(positions)
+            keys.append(positions[query])
+        return keys, list(positions)
+
+    def _submission(self, queries: []):
+        """
+        Return the (chunk, graph) arguments of _run_queries for every chunk of queries, graph being the snapshot for
+        threads and None for processes, whose workers use the snapshot mapped by their initializer
+        """
+        workers = self.max_workers or os.cpu_count() or 1
+        size = self.chunk_size or max(1, -(-len(queries) // (4 * workers)))
+        graph = None if self.processes else self.snapshot
+        return [(queries[i:i + size], graph) for i in range(0, len(queries), size)]
+
+    def _check(self, query: tuple) -> None:
+        """
+        Raise a ValueError for a query that is not a read method of the snapshot
+        """
+        if not query or query[0] not in QUERY_METHODS or not hasattr(self.snapshot, query[0]):
+            raise ValueError(f'unsupported query {query!r}')
+
+
+# snapshot and shared memory block mapped by a process pool worker
+_worker_graph = None
+_worker_memory = None
+
+
+def _init_worker(name: str) -> None:
+    """
+    Pool initializer that maps the shared snapshot into a worker process
+    """
+    global _worker_graph, _worker_memory
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    data = graph_format.unpack(_worker_memory.buf, name)
+    if data.kind == graph_format.DIRECTED:
+        _worker_graph = FrozenDirectedGraph(data.v_count, data.offsets, data.targets, data.weights)
+    else:
+        _worker_graph = CompactUndirectedGraph(data.names, data.offsets, data.targets)
+
+
+def _run_queries(queries: [], graph=None) -> []:
+    """
+    Return the results of a chunk of queries, run on graph or on the snapshot of the worker process
+    """
+    graph = _worker_graph if graph is None else graph
+    return [getattr(graph, query[0])(*(_as_argument(arg) for arg in query[1:])) for query in queries]
+
+
+def _normalize(query) -> tuple:
+    """
+    Return the query as a hashable tuple, lists in the arguments (paths, source lists) become tuples
+    """
+    return tuple(tuple(part) if isinstance(part, list) else part for part in query)
+
+
+def _as_argument(arg):
+    """
+    Turn an argument made hashable by _normalize back into a list
+    """
+    return list(arg) if isinstance(arg, tuple) else arg
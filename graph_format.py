@@ -0,0 +1,149 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Compact binary file format shared by the frozen graph classes, loaded through a read-only memory map.
+
+import io
+import struct
+import sys
+from array import array
+from collections import namedtuple
+from mmap import ACCESS_READ, mmap as memory_map
+
+# File layout, every section starts on an 8 byte boundary:
+#   header        magic, format version, graph kind, weight typecode, byte order, V, number of stored edges, name bytes
+#   offsets       V + 1 int64, the neighbours of vertex v are targets[offsets[v]:offsets[v + 1]]
+#   targets       one int32 vertex id per stored edge
+#   weights       one int64 or float64 per stored edge (directed graphs only)
+#   name offsets  V + 1 int64 byte offsets into the name blob (undirected graphs only)
+#   name blob     the UTF-8 encoded vertex names back to back
+MAGIC = b'CS261GRF'
+FORMAT_VERSION = 2
+DIRECTED = 0
+UNDIRECTED = 1
+HEADER = struct.Struct('<8sIBcBxqqq')    # 40 bytes, so the first section is 8 byte aligned too
+
+GraphData = namedtuple('GraphData', 'kind v_count offsets targets weights names')
+
+
+def save(path, kind: int, v_count: int, offsets, targets, weights=None, names=None) -> None:
+    """
+    Write a graph in CSR form to path
+    weights must be given for directed graphs and names for undirected ones
+    """
+    with open(path, 'wb') as file:
+        _write(file, kind, v_count, offsets, targets, weights, names)
+
+
+def pack(kind: int, v_count: int, offsets, targets, weights=None, names=None) -> bytes:
+    """
+    Return the bytes save would write, e.g. to place the graph in shared memory
+    """
+    file = io.BytesIO()
+    _write(file, kind, v_count, offsets, targets, weights, names)
+    return file.getvalue()
+
+
+def load(path, mmap=True) -> GraphData:
+    """
+    Read a graph written by save
+    With mmap the file is mapped read-only and the arrays are zero-copy views of the mapping, so processes loading the
+    same file share one copy in the page cache. Without it the file is read into memory once.
+    """
+    with open(path, 'rb') as file:
+        buffer = memory_map(file.fileno(), 0, access=ACCESS_READ) if mmap else file.read()
+    return unpack(buffer, path)
+
+
+def unpack(buffer, source='buffer', names=True) -> GraphData:
+    """
+    Read a graph from a buffer holding the bytes written by save or pack (bytes, mmap, shared memory...)
+    The arrays are zero-copy views of the buffer, which must stay alive as long as they are used
+    Without names the vertex names of an undirected graph are not decoded and GraphData.names is None
+    """
+    view = memoryview(buffer)
+
+    magic, version, kind, weight_code, big_endian, v_count, nnz, name_bytes = HEADER.unpack_from(view)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f'{source} is not a graph file of format version {FORMAT_VERSION}')
+    if big_endian != (sys.byteorder == 'big'):
+        raise ValueError(f'{source} was written on a machine with a different byte order')
+
+    position = HEADER.size
+    offsets, position = _read_section(view, position, 'q', v_count + 1)
+    targets, position = _read_section(view, position, 'i', nnz)
+    weights = None
+    if weight_code != b'-':
+        weights, position = _read_section(view, position, weight_code.decode(), nnz)
+    if kind == UNDIRECTED and names:
+        name_offsets, position = _read_section(view, position, 'q', v_count + 1)
+        blob = bytes(view[position:position + name_bytes])
+        names = [blob[name_offsets[i]:name_offsets[i + 1]].decode() for i in range(v_count)]
+    else:
+        names = None
+    return GraphData(kind, v_count, offsets, targets, weights, names)
+
+
+def _write(file, kind: int, v_count: int, offsets, targets, weights=None, names=None) -> None:
+    """
+    Write the header and sections of a graph to a binary file object
+    """
+    offsets = _as_array('q', offsets)
+    targets = _as_array('i', targets)
+    weight_code = b'-'
+    if weights is not None:
+        # keep the typecode of array and memoryview weights (a loaded graph), plain sequences are stored as int64
+        typecode = weights.typecode if isinstance(weights, array) else getattr(weights, 'format', 'q')
+        weights = _as_array(typecode, weights)
+        weight_code = weights.typecode.encode()
+
+    # encode the names back to back and remember where each one starts
+    blob = b''
+    if names is not None:
+        name_offsets = array('q', [0])
+        encoded = []
+        for name in names:
+            if not isinstance(name, str):
+                raise TypeError('vertex names must be strings to be saved')
+            encoded.append(name.encode())
+            name_offsets.append(name_offsets[-1] + len(encoded[-1]))
+        blob = b''.join(encoded)
+
+    file.write(HEADER.pack(MAGIC, FORMAT_VERSION, kind, weight_code, sys.byteorder == 'big',
+                           v_count, len(targets), len(blob)))
+    _write_section(file, offsets)
+    _write_section(file, targets)
+    if weights is not None:
+        _write_section(file, weights)
+    if names is not None:
+        _write_section(file, name_offsets)
+        _write_section(file, blob)
+
+
+def _as_array(typecode: str, values) -> array:
+    """
+    Return values as an array of the given typecode, without copying if it already is one
+    """
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    if isinstance(values, memoryview) and values.format == typecode:
+        return array(typecode, values.tobytes())
+    return array(typecode, values)
+
+
+def _write_section(file, data) -> None:
+    """
+    Write the raw bytes of data followed by zero padding up to the next 8 byte boundary
+    """
+    size = memoryview(data).nbytes
+    file.write(data)
+    file.write(bytes(-size % 8))
+
+
+def _read_section(view: memoryview, position: int, typecode: str, count: int):
+    """
+    Return a typed view of count items starting at position, and the position of the next section
+    """
+    size = count * struct.calcsize(typecode)
+    section = view[position:position + size].cast(typecode)
+    return section, position + size + (-size % 8)
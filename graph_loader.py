@@ -0,0 +1,142 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Streaming edge-list loader that feeds large text/CSV files into the graph classes in chunks.
+
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
+from d_graph import DirectedGraph
+
+
+def load_edges(graph, path, chunk_size=100000, processes=1, progress=None) -> dict:
+    """
+    Stream the edges of a text or CSV file into graph and return the load statistics
+    - one edge per line, "u v" for an UndirectedGraph and "src dst [weight]" for a DirectedGraph (weight defaults to 1)
+    - fields are separated by commas and/or whitespace, blank lines and lines starting with # are ignored
+    - loops and duplicate edges inside a chunk are dropped before they reach the graph
+    - only one chunk of chunk_size lines (per worker) is held in memory at a time
+    - with processes > 1 the chunks are parsed in a pool of worker processes
+    - progress, if given, is called with the statistics after every chunk
+    """
+    directed = isinstance(graph, DirectedGraph)
+    stats = {'lines': 0, 'edges': 0, 'skipped': 0, 'seconds': 0.0, 'edges_per_second': 0.0}
+    start = time.perf_counter()
+
+    for edges, lines, skipped in read_edges(path, directed, chunk_size, processes):
+        if directed:
+            _add_directed(graph, edges)
+        else:
+            for u, v in edges:
+                graph.add_edge(u, v)
+
+        # update the counters and report progress
+        stats['lines'] += lines
+        stats['edges'] += len(edges)
+        stats['skipped'] += skipped
+        stats['seconds'] = time.perf_counter() - start
+        stats['edges_per_second'] = stats['edges'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+        if progress is not None:
+            progress(dict(stats))
+
+    return stats
+
+
+def read_edges(path, directed=False, chunk_size=100000, processes=1):
+    """
+    Lazily yield (edges, lines read, lines skipped) for every chunk of chunk_size lines of the file at path
+    Edges are (u, v) name tuples, or (src, dst, weight) tuples of numbers if directed, with loops and duplicates removed
+    """
+    parse = partial(_parse_chunk, directed=directed)
+    chunks = _read_line_chunks(path, chunk_size)
+
+    # parse in this process, or in a pool that never holds more than two chunks per worker
+    if processes <= 1:
+        yield from map(parse, chunks)
+        return
+    with ProcessPoolExecutor(processes) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(parse, chunk))
+            if len(pending) >= 2 * processes:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _read_line_chunks(path, chunk_size: int):
+    """
+    Yield the lines of the file at path as lists of at most chunk_size lines
+    """
+    with open(path) as file:
+        while True:
+            chunk = list(islice(file, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def _parse_chunk(lines: [], directed=False):
+    """
+    Return (edges, number of lines, number of skipped lines) for a chunk of lines
+    Lines that cannot be parsed are skipped, loops are dropped like add_edge does and duplicates are merged
+    """
+    edges = dict()      # Key is the edge. Value is the weight for a directed graph and None otherwise.
+    skipped = 0
+
+    for line in lines:
+        fields = line.replace(',', ' ').split()
+        # blank lines and comments are not edges
+        if not fields or fields[0].startswith('#'):
+            continue
+
+        try:
+            if directed:
+                u, v = int(fields[0]), int(fields[1])
+                weight = _parse_number(fields[2]) if len(fields) > 2 else 1
+            else:
+                u, v = fields[0], fields[1]
+                weight = None
+        except (IndexError, ValueError):
+            skipped += 1
+            continue
+
+        # loops are never added to the graph
+        if u == v:
+            continue
+
+        # a later directed duplicate overwrites the weight, an undirected edge is the same in both directions
+        if directed:
+            edges[(u, v)] = weight
+        elif (v, u) not in edges:
+            edges[(u, v)] = None
+
+    if directed:
+        return [(u, v, weight) for (u, v), weight in edges.items()], len(lines), skipped
+    return list(edges), len(lines), skipped
+
+
+def _parse_number(text: str):
+    """
+    Return the number in text as an int if it is one and as a float otherwise
+    """
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _add_directed(graph, edges: []) -> None:
+    """
+    Add (src, dst, weight) edges to a DirectedGraph, first adding any vertices they need like start_edges does
+    """
+    if not edges:
+        return
+    highest = max(max(u, v) for u, v, _ in edges)
+    if highest >= graph.v_count:
+        graph.add_vertices(highest + 1 - graph.v_count)
+    for u, v, weight in edges:
+        graph.add_edge(u, v, weight)
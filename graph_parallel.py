@@ -0,0 +1,336 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Multi-process connected components and multi-source BFS over an undirected graph in shared memory.
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import frontier_bfs
+import graph_format
+from ud_graph import CompactUndirectedGraph
+
+try:
+    import numpy as np
+except ImportError:     # NumPy is optional, the workers fall back to pure Python loops over the shared arrays
+    np = None
+
+# BFS levels whose frontier has fewer edges than this are expanded in the calling process, a round of tasks would cost
+# more than it saves
+PARALLEL_MIN_EDGES = 1 << 16
+
+
+class ParallelGraphEngine:
+    """
+    Runs whole-graph algorithms of an undirected graph on a pool of worker processes
+    - the frozen graph is copied once into shared memory, every worker maps it without copying
+    - the vertices are split into contiguous ranges holding about the same number of edges, each task works on one
+      range and only writes the entries of its own vertices (or values every writer agrees on)
+    - connected components: min-label propagation with pointer jumping, every vertex ends up labelled with the
+      smallest vertex id of its component
+    - multi-source BFS: level-synchronous and top-down or bottom-up like frontier_bfs.bfs_levels, levels with a large
+      frontier are split by vertex range across the workers, small ones are expanded in the calling process
+    Results are the same as those of the serial UndirectedGraph methods.
+    """
+
+    def __init__(self, graph, processes=None, tasks_per_process=4):
+        """
+        Freeze the graph, export it to shared memory and start the pool
+        """
+        snapshot = graph.freeze()
+        if not isinstance(snapshot, CompactUndirectedGraph):
+            raise TypeError('ParallelGraphEngine needs an UndirectedGraph or CompactUndirectedGraph')
+        self.snapshot = snapshot
+        self.processes = processes or os.cpu_count() or 1
+        self.v_count = len(snapshot.names)
+        self._labels = None     # component label of every vertex id, computed on first use
+
+        # graph block: the CSR arrays in the layout of graph_format, state block: labels and distances
+        data = graph_format.pack(graph_format.UNDIRECTED, self.v_count, snapshot.offsets, snapshot.neighbors)
+        self._graph_memory = shared_memory.SharedMemory(create=True, size=len(data))
+        self._graph_memory.buf[:len(data)] = data
+        self._state_memory = shared_memory.SharedMemory(create=True, size=max(1, 16 * self.v_count))
+        self._state = _state_views(self._state_memory.buf, self.v_count)
+        self._offsets, self._neighbors = snapshot.offsets, snapshot.neighbors
+        if np is not None:
+            self._offsets = np.frombuffer(snapshot.offsets, dtype=np.int64)
+            self._neighbors = np.frombuffer(snapshot.neighbors, dtype=np.int32)
+
+        self.ranges = _partition(snapshot.offsets, self.processes * tasks_per_process)
+        self._pool = ProcessPoolExecutor(self.processes, initializer=_init_worker,
+                                         initargs=(self._graph_memory.name, self._state_memory.name))
+
+    def __enter__(self) -> 'ParallelGraphEngine':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the pool and release the shared memory
+        """
+        if self._pool is None:
+            return
+        self._pool.shutdown()
+        self._pool = None
+        self._state = None      # views of the shared memory must be released before it is closed
+        for memory in (self._graph_memory, self._state_memory):
+            memory.close()
+            memory.unlink()
+
+    def component_labels(self) -> []:
+        """
+        Return the component label of every vertex id: the smallest vertex id of its component
+        """
+        if self._labels is None:
+            labels = self._state['labels']
+            if np is not None:
+                labels[:] = np.arange(self.v_count)
+            else:
+                labels[:] = array('q', range(self.v_count))
+            # repeat rounds over all ranges until no label changes
+            while any(list(self._pool.map(_propagate_labels, self.ranges))):
+                pass
+            self._labels = labels.tolist()
+        return self._labels
+
+    def count_connected_components(self) -> int:
+        """
+        Return number of connected components in the graph
+        """
+        return sum(1 for i, label in enumerate(self.component_labels()) if i == label)
+
+    def same_component(self, u, v) -> bool:
+        """
+        Return True if u and v are in the same connected component, False otherwise
+        """
+        ids = self.snapshot.ids
+        if u not in ids or v not in ids:
+            return False
+        labels = self.component_labels()
+        return labels[ids[u]] == labels[ids[v]]
+
+    def bfs_distances(self, sources: []) -> dict:
+        """
+        Return a dict with the number of hops from the nearest source to every reachable vertex
+        """
+        distances = self._state['distances']
+        offsets, neighbors = self._offsets, self._neighbors
+        frontier = sorted({self.snapshot.ids[v] for v in sources if v in self.snapshot.ids})
+        distances[:] = _filled(-1, self.v_count, distances)
+        for i in frontier:
+            distances[i] = 0
+
+        frontier_edges = sum(offsets[i + 1] - offsets[i] for i in frontier)
+        unexplored_edges = len(neighbors) - frontier_edges
+        bottom_up = False
+        level = 0
+        while len(frontier) > 0:
+            level += 1
+            # same direction switch as frontier_bfs.bfs_levels
+            if not bottom_up and frontier_edges > unexplored_edges / frontier_bfs.ALPHA:
+                bottom_up = True
+            elif bottom_up and len(frontier) < self.v_count / frontier_bfs.BETA:
+                bottom_up = False
+
+            if not bottom_up and frontier_edges < PARALLEL_MIN_EDGES:
+                # a small frontier costs less to expand here than a round of tasks
+                frontier = _expand(offsets, neighbors, distances, frontier, level)
+            else:
+                list(self._pool.map(_bfs_step, self.ranges, [level] * len(self.ranges),
+                                    [bottom_up] * len(self.ranges)))
+                frontier = _at_distance(distances, level)
+            frontier_edges = _edge_total(offsets, frontier)
+            unexplored_edges -= frontier_edges
+
+        names = self.snapshot.names
+        return {names[i]: level for i, level in enumerate(distances.tolist()) if level >= 0}
+
+
+def _partition(offsets, parts: int) -> []:
+    """
+    Return contiguous (lo, hi) vertex ranges covering every vertex, each with about the same number of vertices plus
+    edges
+    """
+    n = len(offsets) - 1
+    total = n + offsets[n]
+    ranges = []
+    lo = 0
+    for k in range(1, parts + 1):
+        # the first vertex from which the work done so far reaches k / parts of the total
+        goal = total * k // parts
+        hi, end = lo, n
+        while hi < end:
+            middle = (hi + end) // 2
+            if middle + offsets[middle] < goal:
+                hi = middle + 1
+            else:
+                end = middle
+        if k == parts:
+            hi = n
+        if hi > lo:
+            ranges.append((lo, hi))
+            lo = hi
+    return ranges
+
+
+def _state_views(buffer, n: int) -> dict:
+    """
+    Return the int64 arrays of the state block: the component labels, then the BFS distances
+    """
+    if np is not None:
+        labels = np.frombuffer(buffer, dtype=np.int64, count=n)
+        distances = np.frombuffer(buffer, dtype=np.int64, count=n, offset=8 * n)
+    else:
+        view = memoryview(buffer)
+        labels = view[:8 * n].cast('q')
+        distances = view[8 * n:16 * n].cast('q')
+    return {'labels': labels, 'distances': distances}
+
+
+def _filled(value: int, n: int, like):
+    """
+    Return n copies of value in a form that can be assigned to the slice [:] of the state array like
+    """
+    if np is not None:
+        return value
+    return array(like.format, [value]) * n
+
+
+def _expand(offsets, neighbors, distances, frontier, level: int):
+    """
+    Give the undiscovered neighbours of the frontier vertices distance level and return them as the next frontier
+    """
+    if np is not None:
+        _, found = frontier_bfs._gather(offsets, neighbors, np.asarray(frontier, dtype=np.int64))
+        reached = np.unique(found[distances[found] == -1])
+        distances[reached] = level
+        return reached
+
+    reached = []
+    for vertex in frontier:
+        for i in neighbors[offsets[vertex]:offsets[vertex + 1]]:
+            if distances[i] == -1:
+                distances[i] = level
+                reached.append(i)
+    return reached
+
+
+def _at_distance(distances, level: int):
+    """
+    Return the vertices at distance level
+    """
+    if np is not None:
+        return np.flatnonzero(distances == level)
+    return [i for i, distance in enumerate(distances) if distance == level]
+
+
+def _edge_total(offsets, vertices) -> int:
+    """
+    Return the sum of the degrees of vertices
+    """
+    if np is not None:
+        return int((offsets[vertices + 1] - offsets[vertices]).sum())
+    return sum(offsets[i + 1] - offsets[i] for i in vertices)
+
+
+# graph and state mapped by a pool worker
+_worker = None
+
+
+def _init_worker(graph_name: str, state_name: str) -> None:
+    """
+    Pool initializer that maps the shared graph and state into a worker process
+    """
+    global _worker
+    graph_memory = shared_memory.SharedMemory(name=graph_name)
+    state_memory = shared_memory.SharedMemory(name=state_name)
+    data = graph_format.unpack(graph_memory.buf, graph_name, names=False)
+    offsets, neighbors = data.offsets, data.targets
+    if np is not None:
+        offsets = np.frombuffer(offsets, dtype=np.int64)
+        neighbors = np.frombuffer(neighbors, dtype=np.int32)
+    _worker = dict(_state_views(state_memory.buf, data.v_count), offsets=offsets, neighbors=neighbors,
+                   memory=(graph_memory, state_memory))
+
+
+def _propagate_labels(bounds) -> bool:
+    """
+    Lower the label of every vertex in range(*bounds) to the smallest label of its neighbours, then point it at the
+    label of its label until that no longer changes. Return True if any label changed.
+    Labels only ever decrease and always name a vertex of the same component, so reading labels other workers are
+    writing at the same time is safe.
+    """
+    lo, hi = bounds
+    offsets, neighbors, labels = _worker['offsets'], _worker['neighbors'], _worker['labels']
+    changed = False
+
+    if np is not None:
+        start = offsets[lo]
+        degrees = offsets[lo + 1:hi + 1] - offsets[lo:hi]
+        owners = np.flatnonzero(degrees)
+        if len(owners) > 0:
+            # minimum neighbour label per vertex with at least one neighbour
+            lowest = np.minimum.reduceat(labels[neighbors[start:offsets[hi]]], offsets[lo:hi][owners] - start)
+            current = labels[lo:hi]
+            improved = lowest < current[owners]
+            if improved.any():
+                current[owners[improved]] = lowest[improved]
+                changed = True
+        while True:
+            current = labels[lo:hi]
+            jumped = labels[current]
+            shorter = jumped < current
+            if not shorter.any():
+                return changed
+            current[shorter] = jumped[shorter]
+            changed = True
+
+    for vertex in range(lo, hi):
+        label = labels[vertex]
+        for i in neighbors[offsets[vertex]:offsets[vertex + 1]]:
+            if labels[i] < label:
+                label = labels[i]
+        while labels[label] < label:
+            label = labels[label]
+        if label < labels[vertex]:
+            labels[vertex] = label
+            changed = True
+    return changed
+
+
+def _bfs_step(bounds, level: int, bottom_up: bool) -> None:
+    """
+    Discover the vertices at distance level for the vertex range range(*bounds), the frontier being the vertices at
+    distance level - 1
+    - top-down: the frontier vertices of the range mark their undiscovered neighbours (wherever they are), concurrent
+      writers of the same vertex all write the same level
+    - bottom-up: the undiscovered vertices of the range look for a neighbour in the frontier, only the range is written
+    Vertices at distance level - 1 are never written during the step, so the frontier stays the same for every task.
+    """
+    lo, hi = bounds
+    offsets, neighbors, distances = _worker['offsets'], _worker['neighbors'], _worker['distances']
+
+    if np is not None:
+        if bottom_up:
+            candidates = lo + np.flatnonzero(distances[lo:hi] == -1)
+            owners, found = frontier_bfs._gather(offsets, neighbors, candidates)
+            hits = np.bincount(owners[distances[found] == level - 1], minlength=len(candidates))
+            distances[candidates[hits > 0]] = level
+        else:
+            _expand(offsets, neighbors, distances, lo + np.flatnonzero(distances[lo:hi] == level - 1), level)
+        return
+
+    for vertex in range(lo, hi):
+        if bottom_up and distances[vertex] == -1:
+            for i in neighbors[offsets[vertex]:offsets[vertex + 1]]:
+                if distances[i] == level - 1:
+                    distances[vertex] = level
+                    break
+        elif not bottom_up and distances[vertex] == level - 1:
+            for i in neighbors[offsets[vertex]:offsets[vertex + 1]]:
+                if distances[i] == -1:
+                    distances[i] = level
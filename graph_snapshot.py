@@ -0,0 +1,56 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Single writer / many readers publishing of immutable graph snapshots.
+
+import threading
+from contextlib import contextmanager
+
+
+class SnapshotPublisher:
+    """
+    Publishes frozen snapshots of a graph that one writer mutates while many threads read it
+    - readers call current() and run any read method on the returned snapshot without locking, it never changes
+    - the writer mutates the graph and calls publish() (or wraps its writes in batch()), which freezes the graph and
+      swaps the published reference in a single assignment
+    - readers still holding an older snapshot keep a consistent view of it until they drop it
+    Works with DirectedGraph (and its backends) and UndirectedGraph, or anything else with a freeze() method.
+    """
+
+    def __init__(self, graph):
+        """
+        Store the graph and publish its first snapshot
+        """
+        self.graph = graph
+        self.published = 1                  # number of snapshots published so far
+        self._writer = threading.RLock()    # serializes writers, readers never take it
+        self._snapshot = graph.freeze()
+
+    def current(self):
+        """
+        Return the latest published snapshot
+        """
+        return self._snapshot
+
+    def publish(self):
+        """
+        Freeze the graph and make the result the current snapshot, then return it
+        Nothing is rebuilt or published if the graph did not change since the last snapshot
+        """
+        with self._writer:
+            snapshot = self.graph.freeze()
+            if snapshot is not self._snapshot:
+                self._snapshot = snapshot
+                self.published += 1
+        return snapshot
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager around a batch of writes: yields the graph to mutate and publishes once the block exits
+        Other writers using batch() or publish() wait until it is done, readers are never blocked. If the block raises,
+        nothing is published and readers keep the previous snapshot.
+        """
+        with self._writer:
+            yield self.graph
+            self.publish()
@@ -0,0 +1,149 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Opt-in instrumentation of the graph algorithms: per call counters, hooks and aggregated snapshots.
+
+import time
+
+
+class Instrumentation:
+    """
+    Counters collected by an instrumented graph
+    - every instrumented call reports a dict of counters (wall time in seconds included) under its method name
+    - hooks are called with (method, counters) after every call, e.g. to forward them to a metrics system
+    - snapshot() returns the totals per method since the last reset
+    """
+
+    def __init__(self, hook=None):
+        """
+        Store the hooks and the running totals per method
+        """
+        self.hooks = [] if hook is None else [hook]
+        self.totals = dict()    # Key is the method name. Value is a dict of summed counters plus the number of calls.
+
+    def add_hook(self, hook) -> None:
+        """
+        Call hook(method, counters) after every instrumented call
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook) -> None:
+        """
+        Stop calling hook, does nothing if it was not added
+        """
+        if hook in self.hooks:
+            self.hooks.remove(hook)
+
+    def start(self) -> dict:
+        """
+        Return the counters of a new call, with its start time
+        """
+        return {'started': time.perf_counter()}
+
+    def finish(self, method: str, counters: dict) -> None:
+        """
+        Close a call started with start: add the counters to the totals and pass them to the hooks
+        """
+        counters['seconds'] = time.perf_counter() - counters.pop('started')
+        totals = self.totals.setdefault(method, {'calls': 0})
+        totals['calls'] += 1
+        for name, value in counters.items():
+            # depths are maxima, everything else adds up
+            if name.startswith('max_'):
+                totals[name] = max(totals.get(name, 0), value)
+            else:
+                totals[name] = totals.get(name, 0) + value
+        for hook in self.hooks:
+            hook(method, counters)
+
+    def snapshot(self) -> dict:
+        """
+        Return a copy of the totals per method
+        """
+        return {method: dict(totals) for method, totals in self.totals.items()}
+
+    def reset(self) -> None:
+        """
+        Clear the totals, the hooks are kept
+        """
+        self.totals.clear()
+
+
+class InstrumentedGraph:
+    """
+    Mixin giving a graph class opt-in instrumentation
+    - off by default: an instrumented method then pays a single None check and counts or times nothing
+    - enable_instrumentation() starts collecting the counters of every instrumented call in an Instrumentation
+    - the graph methods call _start_stats() for a counter dict (None while off) and _finish_stats() to report it
+    """
+
+    # opt-in instrumentation, None (no counting, no timing) unless enable_instrumentation() is called
+    _instrumentation = None
+
+    def enable_instrumentation(self, hook=None) -> Instrumentation:
+        """
+        Switch instrumentation on and return the Instrumentation collecting the counters
+        Every instrumented call then reports its wall time and counters (vertices settled or visited, edges relaxed,
+        heap pushes and pops, stale heap entries skipped, traversal depth) to hook(method, counters) if given and to
+        the totals returned by instrumentation_stats
+        """
+        self._instrumentation = Instrumentation(hook)
+        return self._instrumentation
+
+    def disable_instrumentation(self) -> None:
+        """
+        Switch instrumentation off and drop its counters
+        """
+        self._instrumentation = None
+
+    def instrumentation_stats(self) -> dict:
+        """
+        Return the counters summed per method since instrumentation was switched on, None if it is off
+        """
+        if self._instrumentation is None:
+            return None
+        return self._instrumentation.snapshot()
+
+    def _start_stats(self):
+        """
+        Return the counter dict of a new instrumented call, None if instrumentation is off
+        """
+        if self._instrumentation is None:
+            return None
+        return self._instrumentation.start()
+
+    def _finish_stats(self, method: str, stats) -> None:
+        """
+        Report the counters of an instrumented call, does nothing for None
+        """
+        if stats is not None and self._instrumentation is not None:
+            self._instrumentation.finish(method, stats)
+
+    def _collect(self, method: str, traversal, v_start, v_end=None) -> []:
+        """
+        Return the vertices yielded by traversal (iter_dfs or iter_bfs) from v_start up to and including v_end
+        Records the number of vertices visited and the traversal depth when instrumentation is on
+        """
+        visited_vertices = []   # Initialize an empty list of visited vertices
+        stats = self._start_stats()
+
+        if stats is None:
+            for vertex in traversal(v_start):
+                visited_vertices.append(vertex)     # add the vertex to the list of visited vertices
+
+                # if the vertex reached is the end vertex break
+                if vertex == v_end:
+                    break
+            return visited_vertices
+
+        # same loop, also tracking how deep the traversal went
+        max_depth = 0
+        for vertex, depth, _ in traversal(v_start, True):
+            visited_vertices.append(vertex)
+            max_depth = max(max_depth, depth)
+            if vertex == v_end:
+                break
+        stats['vertices_visited'] = len(visited_vertices)
+        stats['max_depth'] = max_depth
+        self._finish_stats(method, stats)
+        return visited_vertices
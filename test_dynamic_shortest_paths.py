@@ -0,0 +1,84 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Randomized comparison of DynamicShortestPaths against a full Dijkstra rerun after every edge change.
+
+import random
+
+from d_graph import DirectedGraph, DynamicShortestPaths, SparseDirectedGraph
+
+
+def _check_against_dijkstra(graph, dynamic, sources, target, before=None, changed=None) -> None:
+    """
+    Assert that the repaired distances, paths and reported changes of every source match a fresh Dijkstra search
+    """
+    for src in sources:
+        expected = graph.dijkstra(src)
+        assert dynamic.distances(src) == expected
+
+        distance, path = dynamic.shortest_path(src, target)
+        assert distance == expected[target]
+        if path:
+            hops = list(zip(path, path[1:]))
+            assert path[0] == src and path[-1] == target
+            assert all(graph._weight(u, v) for u, v in hops)
+            assert sum(graph._weight(u, v) for u, v in hops) == distance
+
+        if changed is not None:
+            # only the vertices whose distance moved are reported, vertices added since are never in the report
+            moved = {vertex: expected[vertex] for vertex in range(len(before[src]))
+                     if expected[vertex] != before[src][vertex]}
+            assert changed.get(src, {}) == moved
+
+
+def test_random_updates_match_dijkstra():
+    """
+    Random edge insertions, weight changes and removals, plus edits made on the graph behind the tracker's back
+    """
+    for seed in range(100):
+        r = random.Random(seed)
+        n = r.randint(2, 20)
+        edges = [(r.randrange(n), r.randrange(n), r.choice([1, 2, 3, 5, 1.5])) for _ in range(r.randint(0, 40))]
+        for cls in (DirectedGraph, SparseDirectedGraph):
+            graph = cls(edges)
+            if graph.v_count < 2:
+                continue
+            sources = r.sample(range(graph.v_count), min(3, graph.v_count))
+            dynamic = DynamicShortestPaths(graph, sources)
+
+            for _ in range(40):
+                before = {src: dynamic.distances(src) for src in sources}
+                u, v = r.randrange(graph.v_count + 1), r.randrange(graph.v_count)
+                operation = r.random()
+                changed = None
+                if operation < 0.45:
+                    changed = dynamic.add_edge(u, v, r.choice([0, 1, 2, 3, 4, 1.5, 8]))
+                elif operation < 0.9:
+                    changed = dynamic.remove_edge(u, v)
+                elif operation < 0.95:
+                    graph.add_edge(u, v, 2)
+                else:
+                    graph.add_vertex()
+                _check_against_dijkstra(graph, dynamic, sources, v, before, changed)
+
+
+def test_tree_edge_removals_match_dijkstra():
+    """
+    Removing edges of the shortest path trees forces the repair to find new parents for whole subtrees
+    """
+    r = random.Random(1)
+    n = 2000
+    graph = SparseDirectedGraph([(r.randrange(n), r.randrange(n), r.randint(1, 20)) for _ in range(8000)])
+    sources = [0, 1, 2]
+    dynamic = DynamicShortestPaths(graph, sources)
+
+    for _ in range(100):
+        dynamic.add_edge(r.randrange(n), r.randrange(n), r.randint(1, 20))
+    _check_against_dijkstra(graph, dynamic, sources, n - 1)
+
+    _, predecessors = dynamic.trees[0]
+    tree_edges = [(parent, vertex) for vertex, parent in predecessors.items() if parent is not None]
+    r.shuffle(tree_edges)
+    for u, v in tree_edges[:100]:
+        dynamic.remove_edge(u, v)
+    _check_against_dijkstra(graph, dynamic, sources, n - 1)
@@ -0,0 +1,65 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Randomized comparison of the level-synchronous BFS against the queue based bfs of the graph classes.
+
+import random
+
+import pytest
+
+import frontier_bfs
+from d_graph import SparseDirectedGraph
+from ud_graph import UndirectedGraph
+
+
+def _hops(graph, sources: []) -> dict:
+    """
+    Return the hop distance from the nearest source to every reachable vertex, one queue based bfs per source
+    """
+    hops = dict()
+    for src in sources:
+        for vertex, depth, _ in graph.iter_bfs(src, True):
+            if hops.get(vertex, depth + 1) > depth:
+                hops[vertex] = depth
+    return hops
+
+
+# every level in plain Python, the default mix, every level vectorised
+@pytest.mark.parametrize('min_edges', [1 << 62, frontier_bfs.VECTOR_MIN_EDGES, 0])
+def test_directed_levels_match_bfs(monkeypatch, min_edges):
+    monkeypatch.setattr(frontier_bfs, 'VECTOR_MIN_EDGES', min_edges)
+    for seed in range(40):
+        r = random.Random(seed)
+        n = r.randint(1, 80)
+        # a long path plus random edges, so the search has both tiny and large levels
+        edges = [(i, i + 1, 1) for i in range(r.randint(0, n - 1))]
+        edges += [(r.randrange(n), r.randrange(n), 1) for _ in range(r.randint(0, 4 * n))]
+        graph = SparseDirectedGraph(edges)
+        if graph.v_count == 0:
+            continue
+        sources = r.sample(range(graph.v_count), r.randint(1, min(3, graph.v_count)))
+
+        expected = _hops(graph, sources)
+        distances = graph.bfs_distances(sources)
+        assert {v: d for v, d in enumerate(list(distances)) if d >= 0} == expected
+        _, order = graph.bfs_distances(sources[:1], ordered=True)
+        assert order == graph.bfs(sources[0])
+
+
+@pytest.mark.parametrize('min_edges', [1 << 62, frontier_bfs.VECTOR_MIN_EDGES, 0])
+def test_undirected_levels_match_bfs(monkeypatch, min_edges):
+    monkeypatch.setattr(frontier_bfs, 'VECTOR_MIN_EDGES', min_edges)
+    for seed in range(40):
+        r = random.Random(seed)
+        n = r.randint(1, 80)
+        graph = UndirectedGraph([(f'p{i}', f'p{i + 1}') for i in range(r.randint(0, n))])
+        for _ in range(r.randint(0, 2 * n)):
+            graph.add_edge(f'v{r.randrange(n)}', r.choice([f'v{r.randrange(n)}', f'p{r.randrange(n)}']))
+        vertices = graph.get_vertices()
+        if not vertices:
+            continue
+        sources = r.sample(vertices, r.randint(1, min(3, len(vertices))))
+
+        assert graph.bfs_distances(sources) == _hops(graph, sources)
+        _, order = graph.bfs_distances(sources[:1], ordered=True)
+        assert order == graph.bfs(sources[0])
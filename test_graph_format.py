@@ -0,0 +1,106 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Round trips of the binary graph format through save and load of the directed and undirected graphs.
+
+import random
+import struct
+
+import pytest
+
+import graph_format
+from d_graph import DirectedGraph, FrozenDirectedGraph, SparseDirectedGraph
+from ud_graph import CompactUndirectedGraph, UndirectedGraph
+
+
+def _random_directed(seed: int, weight) -> SparseDirectedGraph:
+    """
+    Return a random sparse directed graph whose weights are drawn by weight(r)
+    """
+    r = random.Random(seed)
+    n = r.randint(2, 40)
+    return SparseDirectedGraph([(r.randrange(n), r.randrange(n), weight(r)) for _ in range(r.randint(0, 4 * n))])
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+@pytest.mark.parametrize('weight, typecode', [(lambda r: r.randint(1, 9), 'q'),
+                                              (lambda r: r.choice([0.5, 1.25, 3.0, 7.75]), 'd')])
+def test_directed_round_trip(tmp_path, mmap, weight, typecode):
+    for seed in range(10):
+        graph = _random_directed(seed, weight)
+        path = tmp_path / f'directed{seed}.graph'
+        graph.save(path)
+
+        loaded = DirectedGraph.load(path, mmap)
+        assert isinstance(loaded, FrozenDirectedGraph)
+        assert loaded.v_count == graph.v_count
+        assert loaded.weights.format == typecode
+        assert sorted(loaded.get_edges()) == sorted(graph.get_edges())
+        for src in range(graph.v_count):
+            assert loaded.dijkstra(src) == graph.dijkstra(src)
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_undirected_round_trip_keeps_names(tmp_path, mmap):
+    for seed in range(10):
+        r = random.Random(seed)
+        # names of different encoded lengths, so the name offsets are exercised
+        names = ['A', 'bb', 'Ωmega', 'vertex 3', 'ünïcode', 'x' * 17, '', 'z']
+        graph = UndirectedGraph([(r.choice(names), r.choice(names)) for _ in range(r.randint(0, 20))])
+        graph.add_vertex('isolated')
+        path = tmp_path / f'undirected{seed}.graph'
+        graph.save(path)
+
+        loaded = UndirectedGraph.load(path, mmap)
+        assert isinstance(loaded, CompactUndirectedGraph)
+        assert sorted(loaded.get_vertices()) == sorted(graph.get_vertices())
+        assert sorted(map(sorted, loaded.get_edges())) == sorted(map(sorted, graph.get_edges()))
+        for v in graph.get_vertices():
+            assert loaded.bfs(v) == graph.bfs(v)
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_empty_graph_round_trip(tmp_path, mmap):
+    DirectedGraph().save(tmp_path / 'directed.graph')
+    loaded = DirectedGraph.load(tmp_path / 'directed.graph', mmap)
+    assert loaded.v_count == 0 and loaded.get_edges() == []
+
+    UndirectedGraph().save(tmp_path / 'undirected.graph')
+    loaded = UndirectedGraph.load(tmp_path / 'undirected.graph', mmap)
+    assert loaded.get_vertices() == [] and loaded.get_edges() == []
+
+
+def test_sections_are_aligned():
+    data = graph_format.pack(graph_format.UNDIRECTED, 3, [0, 1, 3, 4], [1, 0, 2, 1], names=['a', 'bc', 'def'])
+    assert graph_format.HEADER.size % 8 == 0
+    assert len(data) % 8 == 0
+    # V + 1 offsets, 4 targets padded to 8 bytes each, V + 1 name offsets, 6 name bytes padded
+    assert len(data) == graph_format.HEADER.size + 4 * 8 + 2 * 8 + 4 * 8 + 8
+
+
+def test_load_rejects_the_wrong_kind(tmp_path):
+    _random_directed(0, lambda r: 1).save(tmp_path / 'directed.graph')
+    UndirectedGraph(['AB', 'BC']).save(tmp_path / 'undirected.graph')
+
+    with pytest.raises(ValueError):
+        UndirectedGraph.load(tmp_path / 'directed.graph')
+    with pytest.raises(ValueError):
+        DirectedGraph.load(tmp_path / 'undirected.graph')
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_load_rejects_other_versions(tmp_path, mmap):
+    path = tmp_path / 'graph.graph'
+    UndirectedGraph(['AB', 'BC']).save(path)
+    data = bytearray(path.read_bytes())
+
+    # the version field follows the 8 byte magic
+    for version in (graph_format.FORMAT_VERSION - 1, graph_format.FORMAT_VERSION + 1):
+        struct.pack_into('<I', data, 8, version)
+        path.write_bytes(data)
+        with pytest.raises(ValueError):
+            UndirectedGraph.load(path, mmap)
+
+    path.write_bytes(b'NOTAGRAF' + bytes(data[8:]))
+    with pytest.raises(ValueError):
+        UndirectedGraph.load(path, mmap)
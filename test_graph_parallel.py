@@ -0,0 +1,91 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Randomized comparison of ParallelGraphEngine against the serial UndirectedGraph methods.
+
+import random
+
+import pytest
+
+import graph_parallel
+from graph_parallel import ParallelGraphEngine, _partition
+from ud_graph import UndirectedGraph
+
+
+def _random_graph(r: random.Random) -> UndirectedGraph:
+    """
+    Return a small random graph, possibly empty, with a few isolated vertices
+    """
+    n = r.randint(0, 60)
+    graph = UndirectedGraph([(str(r.randrange(n)), str(r.randrange(n))) for _ in range(r.randint(0, 70))] if n else [])
+    for i in range(r.randint(0, 3)):
+        graph.add_vertex(f'iso{i}')
+    return graph
+
+
+def _check_against_serial(seeds) -> None:
+    """
+    Assert that components and BFS distances of the engine match the serial methods on random graphs
+    """
+    for seed in seeds:
+        r = random.Random(seed)
+        graph = _random_graph(r)
+        with ParallelGraphEngine(graph, processes=r.randint(1, 3), tasks_per_process=r.randint(1, 5)) as engine:
+            assert engine.count_connected_components() == graph.count_connected_components()
+            vertices = graph.get_vertices() + ['missing']
+            for _ in range(10):
+                u, v = r.choice(vertices), r.choice(vertices)
+                assert engine.same_component(u, v) == graph.same_component(u, v)
+                sources = r.sample(vertices, min(len(vertices), r.randint(0, 3)))
+                assert engine.bfs_distances(sources) == graph.bfs_distances(sources)
+
+
+def test_partition_covers_every_vertex():
+    for seed in range(50):
+        r = random.Random(seed)
+        offsets = [0]
+        for _ in range(r.randint(0, 40)):
+            offsets.append(offsets[-1] + r.randint(0, 10))
+        ranges = _partition(offsets, r.randint(1, 12))
+        assert [i for lo, hi in ranges for i in range(lo, hi)] == list(range(len(offsets) - 1))
+
+
+def test_random_graphs_match_serial():
+    _check_against_serial(range(15))
+
+
+def test_random_graphs_match_serial_with_parallel_levels(monkeypatch):
+    # every BFS level goes to the workers, not only the large ones
+    monkeypatch.setattr(graph_parallel, 'PARALLEL_MIN_EDGES', 0)
+    _check_against_serial(range(15, 30))
+
+
+def test_random_graphs_match_serial_without_numpy(monkeypatch):
+    # the pure Python loops, forked workers inherit the missing NumPy
+    monkeypatch.setattr(graph_parallel, 'np', None)
+    monkeypatch.setattr(graph_parallel, 'PARALLEL_MIN_EDGES', 0)
+    _check_against_serial(range(30, 40))
+
+
+@pytest.mark.parametrize('min_edges', [0, graph_parallel.PARALLEL_MIN_EDGES])
+def test_grid_and_long_chain_match_serial(monkeypatch, min_edges):
+    """
+    A grid and a long path: many BFS levels and many label propagation rounds
+    """
+    monkeypatch.setattr(graph_parallel, 'PARALLEL_MIN_EDGES', min_edges)
+    side = 40
+    graph = UndirectedGraph()
+    for x in range(side):
+        for y in range(side):
+            if x + 1 < side:
+                graph.add_edge(f'{x},{y}', f'{x + 1},{y}')
+            if y + 1 < side:
+                graph.add_edge(f'{x},{y}', f'{x},{y + 1}')
+    for i in range(500):
+        graph.add_edge(f'c{i}', f'c{i + 1}')
+
+    with ParallelGraphEngine(graph, processes=2) as engine:
+        assert engine.count_connected_components() == graph.count_connected_components() == 2
+        assert engine.same_component('0,0', f'{side - 1},{side - 1}')
+        assert not engine.same_component('0,0', 'c0')
+        assert engine.bfs_distances(['0,0', 'c250']) == graph.bfs_distances(['0,0', 'c250'])
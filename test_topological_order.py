@@ -0,0 +1,151 @@
+# Course: CS261 - Data Structures
+# Author: Guru Updesh Singh
+# Assignment: 6
+# Description: Randomized checks of the online topological order and of the strongly connected components against
+#              plain reachability.
+
+import random
+
+import pytest
+
+from d_graph import DirectedGraph, SparseDirectedGraph
+
+
+def _reachable(graph, start: int) -> set:
+    """
+    Return the set of vertices reachable from start, start included, found from get_edges alone
+    """
+    successors = [[] for _ in range(graph.v_count)]
+    for u, v, _ in graph.get_edges():
+        successors[u].append(v)
+    reached = {start}
+    stack = [start]
+    while stack:
+        for i in successors[stack.pop()]:
+            if i not in reached:
+                reached.add(i)
+                stack.append(i)
+    return reached
+
+
+def _has_cycle(graph) -> bool:
+    """
+    Return True if some edge u -> v has u reachable from v
+    """
+    return any(u in _reachable(graph, v) for u, v, _ in graph.get_edges())
+
+
+def _random_dag(cls, r: random.Random):
+    """
+    Return a random acyclic graph whose vertex numbering is not a topological order
+    """
+    n = r.randint(1, 25)
+    rank = list(range(n))
+    r.shuffle(rank)
+    edges = []
+    for _ in range(r.randint(0, 2 * n)):
+        u, v = sorted(r.sample(range(n), 2)) if n > 1 else (0, 0)
+        if u != v:
+            edges.append((rank[u], rank[v], r.randint(1, 5)))
+    graph = cls(edges)
+    graph.add_vertices(n - graph.v_count)
+    return graph
+
+
+def _check_order(graph) -> None:
+    """
+    Assert that the maintained order is a permutation of the vertices that every edge agrees with
+    """
+    order = graph.topological_sort()
+    assert sorted(order) == list(range(graph.v_count))
+    position = {vertex: i for i, vertex in enumerate(order)}
+    assert all(position[u] < position[v] for u, v, _ in graph.get_edges())
+
+
+@pytest.mark.parametrize('cls', [DirectedGraph, SparseDirectedGraph])
+@pytest.mark.parametrize('reject_cycles', [True, False])
+def test_online_order_stays_valid(cls, reject_cycles):
+    for seed in range(60):
+        r = random.Random(seed)
+        graph = _random_dag(cls, r)
+        assert graph.maintain_topological_order(reject_cycles)
+
+        for _ in range(60):
+            n = graph.v_count
+            operation = r.random()
+            if operation < 0.6:
+                u, v = r.randrange(n), r.randrange(n)
+                # reachability decides whether the edge closes a cycle, an existing edge only changes its weight
+                closes_cycle = u != v and u in _reachable(graph, v) and (u, v) not in {e[:2] for e in graph.get_edges()}
+                assert graph.would_create_cycle(u, v) == closes_cycle
+                edges = graph.get_edges()
+                graph.add_edge(u, v, r.randint(1, 5))
+                if closes_cycle and reject_cycles:
+                    assert graph.get_edges() == edges
+                elif closes_cycle:
+                    assert graph._topo is None
+            elif operation < 0.9:
+                graph.remove_edge(r.randrange(n), r.randrange(n))
+            else:
+                graph.add_vertex()
+
+            assert graph.has_cycle() == _has_cycle(graph)
+            if graph._topo is not None:
+                _check_order(graph)
+            else:
+                # the order is only dropped when a cycle is let in
+                assert not reject_cycles and graph.has_cycle()
+                break
+        if reject_cycles:
+            assert graph._topo is not None
+
+
+def _random_graph(cls, seed: int):
+    """
+    Return a random graph, cycles and isolated vertices included
+    """
+    r = random.Random(seed)
+    n = r.randint(1, 30)
+    graph = cls([(r.randrange(n), r.randrange(n), r.randint(1, 9)) for _ in range(r.randint(0, 2 * n))])
+    graph.add_vertices(n - graph.v_count)
+    return graph
+
+
+@pytest.mark.parametrize('cls', [DirectedGraph, SparseDirectedGraph])
+def test_components_match_reachability(cls):
+    for seed in range(80):
+        graph = _random_graph(cls, seed)
+        reach = [_reachable(graph, v) for v in range(graph.v_count)]
+        expected = {frozenset(u for u in reach[v] if v in reach[u]) for v in range(graph.v_count)}
+
+        components = graph.strongly_connected_components()
+        assert {frozenset(c) for c in components} == expected
+        assert sum(len(c) for c in components) == graph.v_count
+        assert all(c == sorted(c) for c in components)
+
+        # every edge between two components goes from an earlier one to a later one
+        index = {v: k for k, c in enumerate(components) for v in c}
+        assert all(index[u] <= index[v] for u, v, _ in graph.get_edges())
+
+        # every backend gives the same list
+        assert graph.freeze().strongly_connected_components() == components
+
+
+@pytest.mark.parametrize('cls', [DirectedGraph, SparseDirectedGraph])
+def test_condensation_is_an_ordered_dag(cls):
+    for seed in range(80):
+        graph = _random_graph(cls, seed)
+        dag, component = graph.condensation()
+        components = graph.strongly_connected_components()
+
+        assert dag.v_count == len(components)
+        assert all(component[v] == k for k, c in enumerate(components) for v in c)
+        assert not dag.has_cycle()
+        assert all(u < v for u, v, _ in dag.get_edges())
+
+        lightest = dict()
+        for u, v, weight in graph.get_edges():
+            key = component[u], component[v]
+            if key[0] != key[1]:
+                lightest[key] = min(weight, lightest.get(key, weight))
+        assert {(u, v): weight for u, v, weight in dag.get_edges()} == lightest
@@ -3,10 +3,139 @@
 # Assignment: 6
 # Description: Implementation of an undirected graph class.
 
+from array import array
 from collections import deque
 
+import frontier_bfs
+import graph_format
+from graph_arrays import as_list
+from graph_stats import InstrumentedGraph
 
-class UndirectedGraph:
+try:
+    import numpy as np
+except ImportError:     # NumPy is optional, results are returned as lists without it
+    np = None
+
+
+class NeighborSet:
+    """
+    Insertion-ordered set of neighbours with O(1) membership test, insertion and removal
+    - printed like a list so the graph output is unchanged
+    - keeps a cached alphabetically sorted view for the traversals, dropped whenever the set changes
+    """
+
+    __slots__ = ('_items', '_sorted')
+
+    def __init__(self, items=()):
+        """
+        Store the neighbours as keys of a dict, which keeps insertion order
+        """
+        self._items = dict.fromkeys(items)
+        self._sorted = None     # sorted tuple of the neighbours, None until asked for or after a change
+
+    def __contains__(self, v) -> bool:
+        return v in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return repr(list(self._items))
+
+    def add(self, v) -> None:
+        """
+        Add a neighbour, does nothing if it is already present
+        """
+        if v not in self._items:
+            self._items[v] = None
+            self._sorted = None
+
+    def discard(self, v) -> None:
+        """
+        Remove a neighbour, does nothing if it is not present
+        """
+        if v in self._items:
+            del self._items[v]
+            self._sorted = None
+
+    def sorted(self) -> tuple:
+        """
+        Return the neighbours in alphabetical order, sorting only once per change of the set
+        """
+        if self._sorted is None:
+            self._sorted = tuple(sorted(self._items))
+        return self._sorted
+
+
+class ComponentIndex:
+    """
+    Union-find over the vertices of an undirected graph
+    - answers "which component is v in" in near-constant time
+    - supports adding vertices and edges, deletions require a rebuild
+    """
+
+    def __init__(self, adj_list=None):
+        """
+        Build the index from an adjacency list (empty if none is given)
+        """
+        self.parent = dict()    # key is a vertex, value is its parent in the union-find forest
+        self.size = dict()      # key is a root vertex, value is the number of vertices in its component
+        self.count = 0          # number of connected components
+
+        if adj_list is not None:
+            for v in adj_list:
+                self.add(v)
+            for v in adj_list:
+                for u in adj_list[v]:
+                    self.union(u, v)
+
+    def add(self, v) -> None:
+        """
+        Add a vertex as a component of its own, does nothing if it is already present
+        """
+        if v in self.parent: return
+        self.parent[v] = v
+        self.size[v] = 1
+        self.count += 1
+
+    def discard(self, v) -> None:
+        """
+        Remove a vertex that has no edges
+        """
+        if v not in self.parent: return
+        del self.parent[v]
+        del self.size[v]
+        self.count -= 1
+
+    def find(self, v):
+        """
+        Return the root of the component containing v
+        """
+        parent = self.parent
+        # walk to the root, pointing every other vertex on the way at its grandparent (path halving)
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    def union(self, u, v) -> None:
+        """
+        Merge the components containing u and v
+        """
+        u, v = self.find(u), self.find(v)
+        if u == v: return
+        # hang the smaller tree under the larger one
+        if self.size[u] < self.size[v]:
+            u, v = v, u
+        self.parent[v] = u
+        self.size[u] += self.size.pop(v)
+        self.count -= 1
+
+
+class UndirectedGraph(InstrumentedGraph):
     """
     Class to implement undirected graph
     - duplicate edges not allowed
@@ -40,6 +169,17 @@ class UndirectedGraph:
             return f'GRAPH: {{{out}}}'
         return f'GRAPH: {{\n  {out}}}'
 
+    # component index, built on the first component query and kept up to date by every mutation after that
+    _components = None
+
+    # number of edges, kept up to date by every mutation
+    _edge_count = 0
+
+    # version counter bumped by every mutation, and the frozen snapshot of the version it was built for
+    _version = 0
+    _frozen = None
+    _frozen_version = None
+
     # ------------------------------------------------------------------ #
 
     def add_vertex(self, v: str) -> None:
@@ -49,8 +189,53 @@ class UndirectedGraph:
         # if a vertex with the same name as the parameter string already exists in the graph the method will do nothing
         if v in self.adj_list: return
         # otherwise add the value to the adjacency list
-        self.adj_list[v] = []
-        
+        self.adj_list[v] = NeighborSet()
+        if self._components is not None:
+            self._components.add(v)
+        self._version += 1
+
+    def add_vertices(self, vertices) -> None:
+        """
+        Add many vertices to the graph, existing ones are left as they are
+        The neighbour sets are written directly and the graph version changes once for the whole batch
+        """
+        adj_list = self.adj_list
+        added = False
+        for v in vertices:
+            if v in adj_list:
+                continue
+            adj_list[v] = NeighborSet()
+            if self._components is not None:
+                self._components.add(v)
+            added = True
+        if added:
+            self._version += 1
+
+    @classmethod
+    def from_edge_arrays(cls, src, dst):
+        """
+        Build a graph from parallel arrays of edge ends (NumPy arrays or any iterables)
+        Same result as passing the zipped edges as start_edges, with the adjacency sets written directly
+        """
+        src, dst = as_list(src), as_list(dst)
+        if len(src) != len(dst):
+            raise ValueError('src and dst must have the same length')
+
+        graph = cls()
+        adj_list = graph.adj_list
+        for u, v in zip(src, dst):
+            # loops are skipped, duplicate edges are absorbed by the neighbour sets
+            if u == v:
+                continue
+            if u not in adj_list:
+                adj_list[u] = NeighborSet()
+            if v not in adj_list:
+                adj_list[v] = NeighborSet()
+            adj_list[v].add(u)
+            adj_list[u].add(v)
+        graph._edge_count = sum(len(neighbors) for neighbors in adj_list.values()) // 2
+        return graph
+
     def add_edge(self, u: str, v: str) -> None:
         """
         Add edge to the graph
@@ -62,12 +247,15 @@ class UndirectedGraph:
         self.add_vertex(u)
         self.add_vertex(v)
 
-        # if an edge already exists in the graph the method does nothing
-        # update the list of vertices connected to the key (either u or v)
-        if u not in self.adj_list[v]:
-            self.adj_list[v].append(u)
-        if v not in self.adj_list[u]:
-            self.adj_list[u].append(v)
+        # update the set of vertices connected to the key (either u or v)
+        # if an edge already exists in the graph adding it again does nothing
+        if u in self.adj_list[v]: return
+        self._edge_count += 1
+        self.adj_list[v].add(u)
+        self.adj_list[u].add(v)
+        if self._components is not None:
+            self._components.union(u, v)
+        self._version += 1
 
     def remove_edge(self, v: str, u: str) -> None:
         """
@@ -78,8 +266,12 @@ class UndirectedGraph:
         # if there is no edge between u and v the method doesnt does nothing
         if not (v in self.adj_list[u] and u in self.adj_list[v]): return
         # otherwise remove the edge between the two parameter vertices (u and v)
-        self.adj_list[v].remove(u)
-        self.adj_list[u].remove(v)
+        self.adj_list[v].discard(u)
+        self.adj_list[u].discard(v)
+        self._edge_count -= 1
+        # the edge may have split a component, the index is rebuilt on the next query
+        self._components = None
+        self._version += 1
 
     def remove_vertex(self, v: str) -> None:
         """
@@ -87,11 +279,19 @@ class UndirectedGraph:
         """
         # if the given vertex does not exist the method does nothing
         if v not in self.adj_list: return
+        # removing an isolated vertex only drops its own component, otherwise the index is rebuilt on the next query
+        if self._components is not None:
+            if len(self.adj_list[v]) == 0:
+                self._components.discard(v)
+            else:
+                self._components = None
         # remove any reference of the parameter vertex from the adj list
         for successor in self.adj_list[v]:
             if successor in self.adj_list:
-                self.adj_list[successor].remove(v)
+                self.adj_list[successor].discard(v)
+        self._edge_count -= len(self.adj_list[v])
         self.adj_list.pop(v)
+        self._version += 1
 
     def get_vertices(self) -> []:
         """
@@ -104,17 +304,35 @@ class UndirectedGraph:
         """
         Return list of edges in the graph (any order)
         """
-        vertices_list = self.get_vertices()
-        edges = []
+        return list(self.iter_edges())
+
+    def iter_edges(self):
+        """
+        Lazily yield every edge once as a (u, v) tuple, in O(V + E)
+        """
+        done = set()    # vertices whose edges have all been yielded
         # for each vertex
-        for cur_vertex in vertices_list:
+        for cur_vertex in self.adj_list:
             # for each successor of the current vertex
             for successor in self.adj_list[cur_vertex]:
-                # if the edge between the two vertices isn't already in the edges list append the current edge to
-                # the edges list
-                if (successor, cur_vertex) not in edges:
-                    edges.append((cur_vertex, successor))
-        return edges
+                # an edge to a finished vertex was already yielded from the other end
+                if successor not in done:
+                    yield cur_vertex, successor
+            done.add(cur_vertex)
+
+    def edge_count(self) -> int:
+        """
+        Return the number of edges in the graph in O(1)
+        """
+        return self._edge_count
+
+    def degree(self, v) -> int:
+        """
+        Return the number of edges at vertex v in O(1), 0 if v is not in the graph
+        """
+        if v not in self.adj_list:
+            return 0
+        return len(self.adj_list[v])
 
     def is_valid_path(self, path: []) -> bool:
         """
@@ -134,34 +352,420 @@ class UndirectedGraph:
                 return False
         return True
 
+    def validate_paths(self, paths: []):
+        """
+        Return a boolean array (a list without NumPy) saying for each path whether is_valid_path accepts it
+        Every hop is a hashed neighbour-set lookup, so the cost is one O(1) check per hop
+        """
+        return _as_bool_array([self.is_valid_path(path) for path in paths])
+
     def dfs(self, v_start, v_end=None) -> []:
         """
         Return list of vertices visited during DFS search
         Vertices are picked in alphabetical order
         """
-        visited_vertices = []   # Initialize an empty list of visited vertices
-        stack = deque()     # Initialize an empty stack
+        return self._collect('dfs', self.iter_dfs, v_start, v_end)
+
+    def bfs(self, v_start, v_end=None) -> []:
+        """
+        Return list of vertices visited during BFS search
+        Vertices are picked in alphabetical order
+        """
+        return self._collect('bfs', self.iter_bfs, v_start, v_end)
+
+    def iter_dfs(self, v_start, with_info=False):
+        """
+        Lazily yield vertices in DFS order (same order as dfs) in O(V + E)
+        If with_info is True yield (vertex, depth, parent) tuples instead, parent is None for v_start
+        """
+        visited = set()     # Initialize an empty set of visited vertices
+        stack = deque()     # Initialize an empty stack of (vertex, depth, parent)
 
         # if the starting vertex is in the graph add it to the stack
         if v_start in self.adj_list:
-            stack.append(v_start)
+            stack.append((v_start, 0, None))
 
         # if the stack is not empty, pop a vertex
         while len(stack) > 0:
-            vertex = stack.pop()
+            vertex, depth, parent = stack.pop()
+
+            # skip the vertex if it was already reached through another path
+            if vertex in visited:
+                continue
+            visited.add(vertex)
+            yield (vertex, depth, parent) if with_info else vertex
+
+            # push each unvisited direct successor of the current vertex to the stack
+            for successor in reversed(self.adj_list[vertex].sorted()):
+                if successor not in visited:
+                    stack.append((successor, depth + 1, vertex))
+
+    def iter_bfs(self, v_start, with_info=False):
+        """
+        Lazily yield vertices in BFS order (same order as bfs) in O(V + E)
+        If with_info is True yield (vertex, depth, parent) tuples instead, parent is None for v_start
+        """
+        # if the starting vertex is not in the graph there is nothing to visit
+        if v_start not in self.adj_list:
+            return
+
+        discovered = {v_start}  # vertices are marked when enqueued so each one is enqueued only once
+        queue = deque([(v_start, 0, None)])     # queue of (vertex, depth, parent)
+
+        # if the queue is not empty, dequeue a vertex
+        while len(queue) > 0:
+            vertex, depth, parent = queue.popleft()
+            yield (vertex, depth, parent) if with_info else vertex
+
+            # enqueue each undiscovered direct successor of the current vertex to the queue
+            for successor in self.adj_list[vertex].sorted():
+                if successor not in discovered:
+                    discovered.add(successor)
+                    queue.append((successor, depth + 1, vertex))
+
+    def count_connected_components(self):
+        """
+        Return number of connected components in the graph
+        """
+        return self._component_index().count
+
+    def same_component(self, u, v) -> bool:
+        """
+        Return True if u and v are in the same connected component, False otherwise
+        """
+        # if u or/and v do not exist in the graph they are not connected
+        if u not in self.adj_list or v not in self.adj_list:
+            return False
+        index = self._component_index()
+        return index.find(u) == index.find(v)
+
+    def _component_index(self) -> ComponentIndex:
+        """
+        Return the component index, building it from the adjacency list if there is none
+        """
+        if self._components is None:
+            self._components = ComponentIndex(self.adj_list)
+        return self._components
+
+    def has_cycle(self):
+        """
+        Return True if graph contains a cycle, False otherwise
+        """
+        stats = self._start_stats()
+        found = self._find_cycle(stats)
+        self._finish_stats('has_cycle', stats)
+        return found
+
+    def _find_cycle(self, stats=None) -> bool:
+        """
+        Do the work of has_cycle, filling the stats dict with counters if one is given
+        """
+        visited = set()     # vertices are marked when pushed so each one is expanded only once
+
+        # sweep every component once with an iterative DFS
+        for start in self.adj_list:
+            if start in visited:
+                continue
+            visited.add(start)
+            stack = [(start, None, 0)]  # stack of (vertex, parent the vertex was reached from, depth)
+            max_depth = 0
+
+            while stack:
+                vertex, parent, depth = stack.pop()
+                max_depth = max(max_depth, depth)
+                for successor in self.adj_list[vertex]:
+                    # the edge back to the parent is the one we came through
+                    if successor == parent:
+                        continue
+                    # reaching an already visited vertex through another edge closes a cycle
+                    if successor in visited:
+                        if stats is not None:
+                            stats['vertices_visited'] = len(visited)
+                            stats['max_depth'] = max(stats.get('max_depth', 0), max_depth)
+                        return True
+                    visited.add(successor)
+                    stack.append((successor, vertex, depth + 1))
+            if stats is not None:
+                stats['max_depth'] = max(stats.get('max_depth', 0), max_depth)
+        if stats is not None:
+            stats['vertices_visited'] = len(visited)
+
+        # if we get through all the vertices and haven't found a single cycle return False
+        return False
+
+    def would_create_cycle(self, u, v) -> bool:
+        """
+        Return True if adding the edge u-v would create a new cycle, False otherwise
+        Answered from the component index, without a traversal
+        """
+        # loops are not allowed and an existing edge would not be added again
+        if u == v or u not in self.adj_list or v not in self.adj_list or v in self.adj_list[u]:
+            return False
+        # a new edge closes a cycle exactly when its ends are already connected
+        return self.same_component(u, v)
+
+    def compact(self) -> 'CompactUndirectedGraph':
+        """
+        Return a read-only copy of the graph with integer vertex ids and array-backed neighbour storage
+        """
+        return CompactUndirectedGraph.from_adj_list(self.adj_list)
+
+    def freeze(self) -> 'CompactUndirectedGraph':
+        """
+        Return an immutable snapshot of the graph (its compact form) that threads can read without locking
+        The snapshot is built once per graph version, freezing again without a mutation in between returns the same one
+        """
+        if self._frozen is None or self._frozen_version != self._version:
+            self._frozen = self.compact()
+            self._frozen_version = self._version
+        return self._frozen
 
-            # if the vertex is not in the list of visited vertices
-            if vertex not in visited_vertices:
-                visited_vertices.append(vertex)     # add the vertex to the list of visited vertices
+    def bfs_distances(self, sources: [], ordered=False):
+        """
+        Return a dict with the number of hops from the nearest source to every reachable vertex
+        Runs a level-synchronous, direction-optimizing BFS on a compact copy, see CompactUndirectedGraph.bfs_distances
+        """
+        return self.freeze().bfs_distances(sources, ordered)
 
-                # if the vertex popped is the end vertex break
-                if vertex == v_end:
-                    break
+    def bidirectional_bfs(self, v_start, v_end):
+        """
+        Return a tuple (path, explored) for a path with the fewest edges from v_start to v_end, where explored is the
+        number of vertices expanded. See _bidirectional_bfs, the path is [] if v_end cannot be reached
+        """
+        stats = self._start_stats()
+        path, explored = _bidirectional_bfs(lambda v: self.adj_list[v].sorted(), self.adj_list, v_start, v_end)
+        if stats is not None:
+            stats['vertices_visited'] = explored
+        self._finish_stats('bidirectional_bfs', stats)
+        return path, explored
 
-                # push each vertex that is a direct successor of the current vertex to the stack
-                for successor in reversed(sorted(self.adj_list[vertex])):
-                    stack.append(successor)
+    def save(self, path) -> None:
+        """
+        Write the graph to path in the binary format of graph_format
+        """
+        self.freeze().save(path)
 
+    @staticmethod
+    def load(path, mmap=True) -> 'CompactUndirectedGraph':
+        """
+        Read a graph written by save as a CompactUndirectedGraph
+        With mmap the neighbour arrays are read-only views of the mapped file, shared by every process loading it
+        """
+        return CompactUndirectedGraph.load(path, mmap)
+
+
+class CompactUndirectedGraph:
+    """
+    Read-only undirected graph for large inputs
+    - vertex names are interned to dense integer ids 0..V-1 in first-seen order
+    - neighbours of id i are neighbors[offsets[i]:offsets[i + 1]], stored as 4 byte ids in alphabetical order
+    - every method takes and returns vertex names like UndirectedGraph
+    """
+
+    def __init__(self, names: [], offsets, neighbors):
+        """
+        Store graph info as an interning table plus compressed neighbour arrays
+        """
+        self.names = names                                          # id -> vertex name
+        self.ids = {name: i for i, name in enumerate(names)}        # vertex name -> id
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self._labels = None     # component id of every vertex, computed on first use
+        self._ranks = None      # alphabetical position of every vertex id, the sort key of the neighbour slices
+
+    def __getstate__(self):
+        """
+        Copy arrays that are views of a memory mapped file into plain arrays so the graph can be pickled
+        """
+        state = dict(self.__dict__)
+        for name in ('offsets', 'neighbors', '_labels'):
+            if isinstance(state[name], memoryview):
+                state[name] = array(state[name].format, state[name].tobytes())
+        return state
+
+    def __str__(self):
+        """
+        Return content of the graph in the same human-readable form as UndirectedGraph
+        """
+        out = [f'{v}: {self._neighbor_names(i)}' for i, v in enumerate(self.names)]
+        out = '\n  '.join(out)
+        if len(out) < 70:
+            out = out.replace('\n  ', ', ')
+            return f'GRAPH: {{{out}}}'
+        return f'GRAPH: {{\n  {out}}}'
+
+    @classmethod
+    def from_adj_list(cls, adj_list: dict) -> 'CompactUndirectedGraph':
+        """
+        Build the compact form of an UndirectedGraph adjacency list
+        """
+        names = list(adj_list)
+        ids = {name: i for i, name in enumerate(names)}
+        rank = _name_ranks(names)
+
+        offsets = array('q', [0])
+        neighbors = array('i')
+        for name in names:
+            neighbors.extend(sorted((ids[u] for u in adj_list[name]), key=rank.__getitem__))
+            offsets.append(len(neighbors))
+        return cls(names, offsets, neighbors)
+
+    @classmethod
+    def from_edges(cls, edges) -> 'CompactUndirectedGraph':
+        """
+        Build the compact form straight from an iterable of (u, v) edges without an UndirectedGraph in between
+        Loops are skipped and duplicate edges are merged, like UndirectedGraph.add_edge
+        """
+        # intern the names and keep the edge ends as two id arrays
+        ids = dict()
+        ends = array('i')
+        for u, v in edges:
+            if u == v:
+                continue
+            for name in (u, v):
+                if name not in ids:
+                    ids[name] = len(ids)
+                ends.append(ids[name])
+        names = list(ids)
+        n = len(names)
+
+        # count the degree of every vertex (duplicates included) and turn the counts into slice offsets
+        offsets = array('q', [0]) * (n + 1)
+        for i in ends:
+            offsets[i + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        # scatter each edge into the slices of both of its ends
+        slots = array('i', [0]) * len(ends)
+        fill = array('q', offsets[:n])
+        for k in range(0, len(ends), 2):
+            u, v = ends[k], ends[k + 1]
+            slots[fill[u]] = v
+            fill[u] += 1
+            slots[fill[v]] = u
+            fill[v] += 1
+        del ends, fill
+
+        # sort every slice alphabetically and drop duplicate edges
+        rank = _name_ranks(names)
+        neighbors = array('i')
+        compact_offsets = array('q', [0])
+        for i in range(n):
+            neighbors.extend(sorted(set(slots[offsets[i]:offsets[i + 1]]), key=rank.__getitem__))
+            compact_offsets.append(len(neighbors))
+        return cls(names, compact_offsets, neighbors)
+
+    def save(self, path) -> None:
+        """
+        Write the graph to path in the binary format of graph_format
+        """
+        graph_format.save(path, graph_format.UNDIRECTED, len(self.names), self.offsets, self.neighbors,
+                          names=self.names)
+
+    @classmethod
+    def load(cls, path, mmap=True) -> 'CompactUndirectedGraph':
+        """
+        Read a graph written by save
+        With mmap the neighbour arrays are read-only views of the mapped file, shared by every process loading it
+        """
+        data = graph_format.load(path, mmap)
+        if data.kind != graph_format.UNDIRECTED:
+            raise ValueError(f'{path} does not hold an undirected graph')
+        return cls(data.names, data.offsets, data.targets)
+
+    def add_vertex(self, v) -> None:
+        raise TypeError('CompactUndirectedGraph is read-only')
+
+    def add_vertices(self, vertices) -> None:
+        raise TypeError('CompactUndirectedGraph is read-only')
+
+    def add_edge(self, u, v) -> None:
+        raise TypeError('CompactUndirectedGraph is read-only')
+
+    def remove_edge(self, v, u) -> None:
+        raise TypeError('CompactUndirectedGraph is read-only')
+
+    def remove_vertex(self, v) -> None:
+        raise TypeError('CompactUndirectedGraph is read-only')
+
+    def compact(self) -> 'CompactUndirectedGraph':
+        return self
+
+    def freeze(self) -> 'CompactUndirectedGraph':
+        return self
+
+    def get_vertices(self) -> []:
+        """
+        Return list of vertices in the graph (any order)
+        """
+        return list(self.names)
+
+    def get_edges(self) -> []:
+        """
+        Return list of edges in the graph (any order)
+        """
+        return list(self.iter_edges())
+
+    def iter_edges(self):
+        """
+        Lazily yield every edge once as a (u, v) tuple
+        """
+        names, offsets, neighbors = self.names, self.offsets, self.neighbors
+        # every edge is stored at both ends, keep the copy at the end with the smaller id
+        for i in range(len(names)):
+            for j in neighbors[offsets[i]:offsets[i + 1]]:
+                if i < j:
+                    yield names[i], names[j]
+
+    def edge_count(self) -> int:
+        """
+        Return the number of edges in the graph
+        """
+        return len(self.neighbors) // 2
+
+    def degree(self, v) -> int:
+        """
+        Return the number of edges at vertex v, 0 if v is not in the graph
+        """
+        if v not in self.ids:
+            return 0
+        i = self.ids[v]
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def is_valid_path(self, path: []) -> bool:
+        """
+        Return true if provided path is valid, False otherwise
+        """
+        if len(path) == 0:
+            return True
+        if path[0] not in self.ids:
+            return False
+
+        for index in range(1, len(path)):
+            if path[index] not in self.ids:
+                return False
+            if not self._has_neighbor(self.ids[path[index - 1]], self.ids[path[index]]):
+                return False
+        return True
+
+    def validate_paths(self, paths: []):
+        """
+        Return a boolean array (a list without NumPy) saying for each path whether is_valid_path accepts it
+        Every hop is a binary search of the sorted neighbour slice, so the cost is O(log degree) per hop without copying
+        """
+        return _as_bool_array([self.is_valid_path(path) for path in paths])
+
+    def dfs(self, v_start, v_end=None) -> []:
+        """
+        Return list of vertices visited during DFS search
+        Vertices are picked in alphabetical order
+        """
+        visited_vertices = []
+        for vertex in self.iter_dfs(v_start):
+            visited_vertices.append(vertex)
+            if vertex == v_end:
+                break
         return visited_vertices
 
     def bfs(self, v_start, v_end=None) -> []:
@@ -169,83 +773,220 @@ class UndirectedGraph:
         Return list of vertices visited during BFS search
         Vertices are picked in alphabetical order
         """
-        visited_vertices = []  # Initialize an empty list of visited vertices
-        queue = deque()  # Initialize an empty queue
+        visited_vertices = []
+        for vertex in self.iter_bfs(v_start):
+            visited_vertices.append(vertex)
+            if vertex == v_end:
+                break
+        return visited_vertices
 
-        # if the starting vertex is in the graph add it to the queue
-        if v_start in self.adj_list:
-            queue.append(v_start)
+    def iter_dfs(self, v_start, with_info=False):
+        """
+        Lazily yield vertices in DFS order, or (vertex, depth, parent) tuples if with_info is True
+        """
+        if v_start not in self.ids:
+            return
+        names, offsets, neighbors = self.names, self.offsets, self.neighbors
+        visited = bytearray(len(names))     # one flag per vertex id
+        stack = deque([(self.ids[v_start], 0, None)])
+
+        while len(stack) > 0:
+            i, depth, parent = stack.pop()
+            if visited[i]:
+                continue
+            visited[i] = 1
+            yield (names[i], depth, parent) if with_info else names[i]
+
+            # neighbours are stored alphabetically, push them in reverse so the smallest is popped first
+            for j in reversed(neighbors[offsets[i]:offsets[i + 1]]):
+                if not visited[j]:
+                    stack.append((j, depth + 1, names[i]))
+
+    def iter_bfs(self, v_start, with_info=False):
+        """
+        Lazily yield vertices in BFS order, or (vertex, depth, parent) tuples if with_info is True
+        """
+        if v_start not in self.ids:
+            return
+        names, offsets, neighbors = self.names, self.offsets, self.neighbors
+        start = self.ids[v_start]
+        discovered = bytearray(len(names))  # one flag per vertex id
+        discovered[start] = 1
+        queue = deque([(start, 0, None)])
 
-        # if the queue is not empty, dequeue a vertex
         while len(queue) > 0:
-            vertex = queue.popleft()
+            i, depth, parent = queue.popleft()
+            yield (names[i], depth, parent) if with_info else names[i]
 
-            # if the vertex is not in the list of visited vertices
-            if vertex not in visited_vertices:
-                visited_vertices.append(vertex)  # add the vertex to the list of visited vertices
+            for j in neighbors[offsets[i]:offsets[i + 1]]:
+                if not discovered[j]:
+                    discovered[j] = 1
+                    queue.append((j, depth + 1, names[i]))
 
-                # if the vertex dequeued is the end vertex break
-                if vertex == v_end:
-                    break
+    def bfs_distances(self, sources: [], ordered=False):
+        """
+        Return a dict with the number of hops from the nearest source to every reachable vertex
+        All sources are searched in one level-synchronous sweep that switches between top-down and bottom-up steps
+        With ordered return a tuple (distances, order) where order is the visiting order of bfs for the same sources
+        """
+        ids = [self.ids[v] for v in sources if v in self.ids]
+        result = frontier_bfs.bfs_levels(self.offsets, self.neighbors, ids, (self.offsets, self.neighbors), ordered)
+        levels, order = result if ordered else (result, None)
 
-                # enqueue each vertex that is a direct successor of the current vertex to the queue
-                for successor in sorted(self.adj_list[vertex]):
-                    # if the vertex is not already visited enqueue it to the queue
-                    if successor not in visited_vertices:
-                        queue.append(successor)
+        distances = {self.names[i]: int(level) for i, level in enumerate(levels) if level >= 0}
+        if ordered:
+            return distances, [self.names[i] for i in order]
+        return distances
 
-        return visited_vertices
+    def bidirectional_bfs(self, v_start, v_end):
+        """
+        Return a tuple (path, explored) for a path with the fewest edges from v_start to v_end, see _bidirectional_bfs
+        """
+        return _bidirectional_bfs(lambda v: self._neighbor_names(self.ids[v]), self.ids, v_start, v_end)
 
     def count_connected_components(self):
         """
         Return number of connected components in the graph
         """
-        count = 0   # initialize count to zero
-        vertices = self.get_vertices()  # get a list of all the vertices in the graph
-
-        # while we have yet to visit every vertex
-        while vertices:
-            # use dfs to return all connected vertices of some vertex in the graph
-            found = self.dfs(vertices.pop())
-            # remove all the vertices found
-            for i in found:
-                if i in vertices:
-                    vertices.remove(i)
-            # increment count
-            count += 1
-        return count
+        labels = self._component_labels()
+        return max(labels) + 1 if labels else 0
+
+    def same_component(self, u, v) -> bool:
+        """
+        Return True if u and v are in the same connected component, False otherwise
+        """
+        if u not in self.ids or v not in self.ids:
+            return False
+        labels = self._component_labels()
+        return labels[self.ids[u]] == labels[self.ids[v]]
 
     def has_cycle(self):
         """
         Return True if graph contains a cycle, False otherwise
         """
-        # for each vertex in the graph if the recursive helper function finds a cycle return True
-        for vertex in self.adj_list:
-            if self.rec_helper_find_cycle(vertex, None, set()) is True:
-                return True
+        # a component without cycles is a tree with one edge less than vertices, so the graph is a forest exactly
+        # when it has V - C edges
+        edge_count = len(self.neighbors) // 2
+        return edge_count > len(self.names) - self.count_connected_components()
 
-        # if we get through all the vertices and haven't found a single cycle return False
-        return False
+    def would_create_cycle(self, u, v) -> bool:
+        """
+        Return True if adding the edge u-v would create a new cycle, False otherwise
+        """
+        if u == v or u not in self.ids or v not in self.ids or self._has_neighbor(self.ids[u], self.ids[v]):
+            return False
+        return self.same_component(u, v)
 
-    def rec_helper_find_cycle(self, current, parent, visited):
+    def _has_neighbor(self, i: int, j: int) -> bool:
         """
-        Returns true if the graph passed to the method has a cycle. Otherwise return False.
+        Return True if vertex id j is a neighbour of vertex id i, in O(log degree)
+        The neighbour slices are sorted alphabetically, so they are binary searched by the rank of the names
         """
-        visited.add(current)    # add the current vertex to the visited vertices set
+        if self._ranks is None:
+            self._ranks = _name_ranks(self.names)
+        rank, neighbors = self._ranks, self.neighbors
+        target = rank[j]
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        end = hi
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if rank[neighbors[middle]] < target:
+                lo = middle + 1
+            else:
+                hi = middle
+        return lo < end and neighbors[lo] == j
 
-        # for all the current vertex's successors if the vertex has not been visited check to see if it has a cycle
-        for vertex in self.adj_list[current]:
-            # if the vertex has been visited and is not the parent vertex then we return True since we have found
-            # a cycle
-            if vertex in visited and vertex != parent:
-                return True
-            # otherwise if vertex has not been visited check to see if it has a cycle
-            if vertex not in visited:
-                # if its does have a cycle return True
-                if self.rec_helper_find_cycle(vertex, current, visited): return True
+    def _neighbor_names(self, i: int) -> []:
+        """
+        Return the names of the neighbours of vertex id i in alphabetical order
+        """
+        return [self.names[j] for j in self.neighbors[self.offsets[i]:self.offsets[i + 1]]]
 
-        # otherwise return False
-        return False
+    def _component_labels(self):
+        """
+        Return an array with the component number of every vertex id, labelled once with an iterative sweep
+        """
+        if self._labels is None:
+            offsets, neighbors = self.offsets, self.neighbors
+            labels = array('i', [-1]) * len(self.names)
+            count = 0
+            for start in range(len(self.names)):
+                if labels[start] != -1:
+                    continue
+                labels[start] = count
+                stack = [start]
+                while stack:
+                    i = stack.pop()
+                    for j in neighbors[offsets[i]:offsets[i + 1]]:
+                        if labels[j] == -1:
+                            labels[j] = count
+                            stack.append(j)
+                count += 1
+            self._labels = labels
+        return self._labels
+
+
+def _bidirectional_bfs(neighbors, vertices, v_start, v_end):
+    """
+    Return a tuple (path, explored) for a path with the fewest edges from v_start to v_end ([] if there is none), where
+    explored is the number of vertices expanded
+    neighbors(v) gives the neighbours of v in alphabetical order and vertices supports membership tests
+    A BFS runs from each end, a whole level of the smaller frontier at a time, and stops as soon as the two searches
+    touch. Each search only goes about half the distance, which explores far fewer vertices than a one-sided search.
+    """
+    if v_start not in vertices or v_end not in vertices:
+        return [], 0
+    if v_start == v_end:
+        return [v_start], 1
+
+    parents = ({v_start: None}, {v_end: None})  # Key is a reached vertex. Value is the vertex it was reached from.
+    frontiers = ([v_start], [v_end])
+    explored = 0
+
+    while frontiers[0] and frontiers[1]:
+        # expand the whole next level of the smaller frontier, the first vertex seen by both searches lies on a
+        # shortest path because no vertex was seen by both before this level
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        seen, other = parents[side], parents[1 - side]
+        next_frontier = []
+        for vertex in frontiers[side]:
+            explored += 1
+            for u in neighbors(vertex):
+                if u in seen:
+                    continue
+                seen[u] = vertex
+                if u in other:
+                    # walk back from the meeting vertex to both ends
+                    path = [u]
+                    while parents[0][path[-1]] is not None:
+                        path.append(parents[0][path[-1]])
+                    path.reverse()
+                    while parents[1][path[-1]] is not None:
+                        path.append(parents[1][path[-1]])
+                    return path, explored
+                next_frontier.append(u)
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+
+    return [], explored
+
+
+def _as_bool_array(values: []):
+    """
+    Return a list of booleans as a NumPy array when NumPy is installed
+    """
+    if np is None:
+        return values
+    return np.array(values, dtype=bool)
+
+
+def _name_ranks(names: []):
+    """
+    Return an array giving the alphabetical position of every name, indexed by id
+    """
+    rank = array('i', [0]) * len(names)
+    for position, i in enumerate(sorted(range(len(names)), key=names.__getitem__)):
+        rank[i] = position
+    return rank
 
 
 if __name__ == '__main__':